@@ -0,0 +1,110 @@
+# Fractal Toolbox is a series of python scripts for generating images
+# and videos based on Julia and Mandelbrot sets.
+# Copyright (C) 2024  Vivien ELIE
+#
+# This file is part of Fractal Toolbox.
+#
+# Fractal Toolbox is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+#
+# Fractal Toolbox is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with Fractal Toolbox.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import time
+
+
+
+
+
+
+# Classes
+class ClassThrottle:
+
+    # Token bucket on the CPU time of this process : tokens are CPU seconds, earned at the share of a CPU
+    # allowed to this process and spent by the calculations. The process only sleeps when the bucket is empty,
+    # just long enough to earn the missing tokens.
+    def __init__(self, cpu_limit, nb_processes):
+        if cpu_limit >= 100:
+            self.rate = 1.0
+        else:
+            self.rate = min(1.0, (cpu_limit / 100) * get_available_cpus() / nb_processes)
+        self.capacity = throttle_burst * self.rate
+        self.tokens = self.capacity
+        self.last_wall_time = time.monotonic()
+        self.last_cpu_time = time.process_time()
+
+    def wait(self):
+        if self.rate >= 1.0:
+            return
+
+        wall_time = time.monotonic()
+        cpu_time = time.process_time()
+        self.tokens = (min(self.capacity, self.tokens + ((wall_time - self.last_wall_time) * self.rate))
+                       - (cpu_time - self.last_cpu_time))
+        self.last_wall_time, self.last_cpu_time = wall_time, cpu_time
+
+        if self.tokens < 0:
+            time.sleep(-self.tokens / self.rate)
+            self.tokens = 0
+            self.last_wall_time = time.monotonic()
+            self.last_cpu_time = time.process_time()
+
+
+
+
+
+
+
+# Globales
+throttle_burst = 0.5            # seconds a process may calculate at full speed under a CPU limit
+
+
+
+
+
+
+# Functions
+def read_cgroup_cpu_quota():
+
+    # CPU quota of the container (cgroup v2, then v1) in number of CPUs, None without quota
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r") as file:
+            quota, period = file.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r") as file:
+            quota = int(file.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r") as file:
+            period = int(file.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+def get_available_cpus():
+
+    # CPUs this process may run on, reduced by the container quota if any
+    try:
+        available_cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available_cpus = os.cpu_count()
+
+    quota = read_cgroup_cpu_quota()
+    if quota is not None:
+        available_cpus = min(available_cpus, quota)
+
+    return available_cpus
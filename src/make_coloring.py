@@ -22,10 +22,10 @@ import argparse
 import csv
 import zipfile
 import struct
-from multiprocessing import Pool, Manager, Lock
-import psutil
-import time
+from multiprocessing import Pool, RawArray, Value
+from threading import Lock, Thread, Event
 from PIL import Image
+from cpu_throttle import ClassThrottle
 Image.MAX_IMAGE_PIXELS = None
 
 
@@ -44,6 +44,43 @@ class ClassInput():
         self.G = 0
         self.B = 0
 
+class ClassProgressReporter:
+
+    # Each worker adds its processed images to its own shared counter, without lock nor message.
+    # A thread of the main process sums the counters and displays the progress at a limited rate.
+    def __init__(self, nb_workers, nb_images, interval):
+        self.counters = RawArray("q", nb_workers)
+        self.next_slot = Value("i", 0)
+        self.nb_images = nb_images
+        self.interval = interval
+        self.string_percent_images = "0"       # nothing to display before the first image
+        self.lock = Lock()
+        self.stop_event = Event()
+        self.thread = None
+
+    def display(self):
+        with self.lock:
+            processed = sum(self.counters)
+            current_percent_images = f"{int(processed / self.nb_images * 100)}"
+            if current_percent_images != self.string_percent_images:
+                print("", end="\r")
+                print(f"{processed}/{self.nb_images}, {current_percent_images}%", end="", flush=True)
+                self.string_percent_images = current_percent_images
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.display()
+
+    def start(self):
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+        self.display()
+
 
 
 
@@ -52,7 +89,10 @@ class ClassInput():
 
 
 # Globales
-lock = Lock()
+progress_counters = None        # shared counters, set in each worker of the pool
+progress_slot = 0
+progress_interval = 0.2         # seconds between two displays of the progress
+throttle = None                 # CPU limitation, set in each worker of the pool
 
 
 
@@ -100,7 +140,17 @@ def ReadInputsFile(inputs_filepath):
     except:
         return []
 
-def process_image(coloring_input, progress, cpu_limit):
+def init_worker(counters, next_slot, cpu_limit, nb_workers):
+    global progress_counters, progress_slot, throttle
+
+    progress_counters = counters
+    with next_slot.get_lock():
+        progress_slot = next_slot.value % len(counters)
+        next_slot.value += 1
+
+    throttle = ClassThrottle(cpu_limit, nb_workers)
+
+def process_image(coloring_input):
 
     try:
 
@@ -137,9 +187,7 @@ def process_image(coloring_input, progress, cpu_limit):
 
         for col in range(0, coloring_input.size_x):
 
-            if cpu_limit < 100:
-                while psutil.cpu_percent(interval=0.0001) > cpu_limit:
-                    time.sleep(0.2)
+            throttle.wait()
 
             for line in range(0, coloring_input.size_y):
 
@@ -150,14 +198,8 @@ def process_image(coloring_input, progress, cpu_limit):
 
         im.save(coloring_input.output_image_pathfile)
 
-        # Display progress
-        with lock:
-            progress["processed"] += 1
-            current_percent_images = f"{int(progress["processed"] / progress['total'] * 100)}"
-            if current_percent_images != progress["string_percent_images"]:
-                print("", end="\r")
-                print(f"{progress["processed"]}/{progress['total']}, {current_percent_images}%", end="")
-                progress["string_percent_images"] = current_percent_images
+        # Count progress, displayed by the main process
+        progress_counters[progress_slot] += 1
 
     except Exception as e:
         print(f"Error processing image {coloring_input.output_image_pathfile}: {e}")
@@ -224,16 +266,15 @@ if __name__ == '__main__':
         sys.exit(1)
 
     # Multiprocessing setup
-    manager = Manager()
-    progress = manager.dict({
-        "processed": 0,
-        "total": len(inputs),
-        "string_percent_images": ""
-    })
+    progress = ClassProgressReporter(args.cores, len(inputs), progress_interval)
+    progress.start()
 
     # Start multiprocessing
-    with Pool(processes=args.cores) as pool:
-        pool.starmap(process_image, [(inp, progress, args.cpu) for inp in inputs])
+    with Pool(processes=args.cores, initializer=init_worker,
+              initargs=(progress.counters, progress.next_slot, args.cpu, args.cores)) as pool:
+        pool.map(process_image, inputs)
+
+    progress.stop()
 
     # End
     sys.exit(0)
@@ -21,21 +21,27 @@ import shutil
 import math
 import sys
 import csv
-from decimal import Decimal, getcontext
+from decimal import Decimal, getcontext, localcontext
 import xml.etree.ElementTree as ET
 from bs4 import BeautifulSoup
-from functools import partial
-from threading import Lock
-from multiprocessing import Pool, Manager
-import psutil
+from threading import Lock, Thread, Event
+from multiprocessing import Pool, RawArray, Value
 import time
-import struct
+import ctypes
+import pickle
 import zipfile
+import queue
 import argparse
-from collections import deque
+import signal
 from enum import Enum
+import numpy as np
 from PIL import Image
+from cpu_throttle import ClassThrottle
 Image.MAX_IMAGE_PIXELS = None
+try:
+    import numba        # optional, compiled kernel backend
+except ImportError:
+    numba = None
 
 
 
@@ -49,6 +55,27 @@ class ClassTypeFractal(Enum):
     JULIA = 0
     MANDELBROT = 1
 
+class ClassEngine(Enum):
+    REFERENCE = 0
+    NUMPY = 1
+    AUTO = 2
+    PERTURBATION = 3
+
+class ClassFrameParallel(Enum):
+    OFF = 0
+    ON = 1
+    AUTO = 2
+
+class ClassTileOrder(Enum):
+    RASTER = 0
+    CENTER = 1
+
+class ClassPrecisionTier(Enum):
+    FLOAT64 = 0
+    EXTENDED = 1
+    PERTURBATION = 2
+    ARBITRARY = 3
+
 class ClassParameters:
     def __init__(self):
         self.description = ""
@@ -63,6 +90,9 @@ class ClassParameters:
         self.logs_pathfile = ""
         self.resume_pathfile = ""
         self.fps = 0
+        self.kernel_backend = "auto"
+        self.iterations_compression = "deflated"
+        self.iterations_compression_level = 9
 
     def CreateNewProjectFile(self, project_filepath):
         root = ET.Element("Project_images")
@@ -79,6 +109,9 @@ class ClassParameters:
         ET.SubElement(root, "logs_pathfile").text = self.logs_pathfile
         ET.SubElement(root, "resume_pathfile").text = self.resume_pathfile
         ET.SubElement(root, "fps").text = str(self.fps)
+        ET.SubElement(root, "kernel_backend").text = self.kernel_backend
+        ET.SubElement(root, "iterations_compression").text = self.iterations_compression
+        ET.SubElement(root, "iterations_compression_level").text = str(self.iterations_compression_level)
 
         tree = ET.ElementTree(root)
 
@@ -119,6 +152,9 @@ class ClassParameters:
         self.logs_pathfile = get_text_or_empty(root.find("logs_pathfile"))
         self.resume_pathfile = get_text_or_empty(root.find("resume_pathfile"))
         self.fps = int(root.find("fps").text)
+        self.kernel_backend = get_text_or_empty(root.find("kernel_backend"), "auto").strip()      # optional, added later
+        self.iterations_compression = get_text_or_empty(root.find("iterations_compression"), "deflated").strip().lower()
+        self.iterations_compression_level = int(get_text_or_empty(root.find("iterations_compression_level"), "9"))
 
 class ClassInput():
     def __init__(self):
@@ -145,6 +181,38 @@ class ClassInput():
         self.move_x = Decimal(0.0)
         self.move_y = Decimal(0.0)
 
+class ClassFrame():
+    def __init__(self):
+        self.index = 0
+        self.type_fractal = ClassTypeFractal.JULIA
+        self.max_iterations = 0
+        self.julia_a = Decimal(0)
+        self.julia_b = Decimal(0)
+        self.xmin = Decimal(0)
+        self.xmax = Decimal(0)
+        self.ymin = Decimal(0)
+        self.ymax = Decimal(0)
+        self.precision = 0
+        self.tier = ClassPrecisionTier.ARBITRARY
+        self.x_axis = None
+        self.y_axis = None
+        self.reference = None
+        self.mirror_cols = None
+        self.mirror_lines = None
+        self.mirrored = None
+        self.buffer_slot = 0
+
+class ClassReferenceOrbit():
+    def __init__(self):
+        self.x = Decimal(0)
+        self.y = Decimal(0)
+        self.orbit_x = None
+        self.orbit_y = None
+        self.series_a = None
+        self.series_b = None
+        self.series_c = None
+        self.series_d = None            # fourth order, only to measure the error of the series
+
 class ClassLogs:
     def __init__(self):
         self.images_number = 0
@@ -154,6 +222,7 @@ class ClassLogs:
         self.nearest_interesting_x = 0
         self.nearest_interesting_y = 0
         self.current_precision = 0
+        self.current_tier = ClassPrecisionTier.ARBITRARY
         self.current_xmin = 0.0
         self.current_xmax = 0.0
         self.current_ymin = 0.0
@@ -180,6 +249,7 @@ class ClassLogs:
                 f"center(x,y)=({self.current_center_x},{self.current_center_y});"
                 f"nearest_interesting(x,y)=({self.nearest_interesting_x},{self.nearest_interesting_y});"
                 f"precision={self.current_precision};"
+                f"tier={self.current_tier.name.lower()};"
                 f"x(min,max)=({self.current_xmin},{self.current_xmax});"
                 f"y(min,max)=({self.current_ymin},{self.current_ymax})")
 
@@ -238,6 +308,154 @@ class ClassResume:
         self.ymax = Decimal(float(root.find("ymax").text))
         self.elapsed_time = float(root.find("elapsed_time").text)
 
+class ClassWorkerContext:
+    def __init__(self):
+        self.inputs = []
+        self.progress_counters = None
+        self.progress_slot = 0
+        self.frame_buffer = None
+        self.state_buffer = None
+        self.frame_data_buffer = None
+        self.frames_data = {}           # last data of a frame read from each slot, with its generation
+        self.throttle = None
+        self.engine = ClassEngine.AUTO
+        self.kernel_backend = "numpy"
+        self.subdivision = False
+
+class ClassProgressReporter:
+
+    # Each worker adds its calculated points to its own shared counter, without lock nor message.
+    # A thread of the main process sums the counters and displays the progress at a limited rate.
+    def __init__(self, nb_workers, interval):
+        self.counters = RawArray("q", nb_workers)
+        self.next_slot = Value("i", 0)
+        self.interval = interval
+        self.base_points = 0
+        self.nb_points = 0
+        self.cnt_images = 0
+        self.nb_images = 0
+        self.string_percent_points = ""
+        self.lock = Lock()
+        self.stop_event = Event()
+        self.thread = None
+
+    def start_frame(self, cnt_images, nb_points):
+        # Counters are never reset since workers may be writing them, the progress starts from their total
+        with self.lock:
+            self.base_points = sum(self.counters)
+            self.cnt_images = cnt_images
+            self.nb_points = nb_points
+            self.string_percent_points = ""
+
+    def add_points(self, nb_points):
+        with self.lock:
+            self.nb_points += nb_points
+
+    def set_image(self, cnt_images):
+        with self.lock:
+            self.cnt_images = cnt_images
+            self.string_percent_points = ""
+
+    def display(self):
+        with self.lock:
+            if self.nb_points == 0:
+                return
+            cnt_points = min(sum(self.counters) - self.base_points, self.nb_points)
+            current_percent_points = f"{int(cnt_points * 100 / self.nb_points)}"
+            if current_percent_points != self.string_percent_points:
+                print("", end="\r")
+                print(f"{(self.cnt_images + 1)}/{self.nb_images}, {current_percent_points}%", end="", flush=True)
+                self.string_percent_points = current_percent_points
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            self.display()
+
+    def start(self):
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+
+class ClassStrip():
+    def __init__(self):
+        self.frames = []
+        self.frame_data = None          # formula, max_iterations, precision and tier of the strip
+        self.inner_frame = 0            # deepest image, calculated normally for the center of all the images
+        self.inner_viewport = None
+        self.inner_frame_data = None
+        self.center_x = Decimal(0)
+        self.center_y = Decimal(0)
+        self.log_radius_min = 0.0
+        self.step = 0.0                 # same step for the log of the radius and for the angle
+        self.nb_radii = 0
+        self.nb_angles = 0
+
+class ClassFrameHandle():
+    def __init__(self):
+        self.slot = 0
+        self.generation = 0
+        self.size = 0
+        self.frame_data = None          # only when the data of the frame does not fit in the shared buffer
+
+class ClassPendingFrame():
+    def __init__(self):
+        self.frame_data = None
+        self.tiles = []
+        self.levels = (1,)
+        self.results = []           # one list of tile results per level
+        self.nb_points = 0
+
+class ClassOutputFrame():
+    def __init__(self):
+        self.index = 0
+        self.iterations = None
+        self.R = 0
+        self.G = 0
+        self.B = 0
+        self.density_map = None         # interesting pixels, the density image is created by the writer
+        self.state = None
+        self.antialiasing = None        # indexes of the refined pixels and the iterations of their samples
+        self.log_line = ""
+        self.resume = None
+
+class ClassFrameWriter:
+
+    # Saves the finished frames in a thread, in their order, while the next frames are calculated.
+    # The log line and the resume file of a frame are only written once its files are on disk.
+    def __init__(self, queue_size):
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def put(self, output_frame):
+        self.check_error()
+        self.queue.put(output_frame)
+
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+        self.check_error()
+
+    def check_error(self):
+        if self.error is not None:
+            raise self.error
+
+    def run(self):
+        while True:
+            output_frame = self.queue.get()
+            if output_frame is None:
+                return
+            if self.error is None:      # after an error, the next frames are dropped so the resume stays valid
+                try:
+                    save_frame(output_frame)
+                except Exception as e:
+                    self.error = e
+
 class ClassEMA:
     def __init__(self, smoothing_factor):
         self.smoothing_factor = smoothing_factor
@@ -264,68 +482,103 @@ class ClassEMA:
 
 # Globales
 debug = ClassDebug.NONE
-lock_cores_percent = Lock()
 parameters = ClassParameters()
 logs = ClassLogs()
 resume = ClassResume()
+worker_context = ClassWorkerContext()      # static data of the run, given once to each worker of the pool
+progress_interval = 0.2                     # seconds between two displays of the progress
+writer_queue_size = 2                       # finished frames waiting to be saved before the calculation waits
+frame_parallel_min_tiles_per_core = 4       # below, 'auto' calculates several images at once
+perturbation_max_precision = 290        # beyond, pixel deltas no longer fit in double precision
+perturbation_glitch_tolerance = 1e-3
+perturbation_max_references = 16
+perturbation_interior_margin = 1e-12    # far above the rounding of the interior tests in double precision
+series_tolerance = 1e-12                # maximal weight of the neglected terms in the series approximation
+series_max_delta = 0.1                  # bound of the approximated offsets, well under the escape radius
+subdivision_min_size = 6                # smaller rectangles are fully calculated
+state_file_suffix = ".state.npz"        # after the iterations prefix and the image number
+strip_band_size = 16                    # radii of the exponential map strip calculated by a task
+iterations_compressions = {"stored": zipfile.ZIP_STORED, "deflated": zipfile.ZIP_DEFLATED,
+                           "bzip2": zipfile.ZIP_BZIP2, "lzma": zipfile.ZIP_LZMA}
+iterations_compression_levels = {"deflated": range(0, 10), "bzip2": range(1, 10)}     # no level for the others
+frame_data_margin = 4 << 20            # bytes of the shared buffer of a frame, beyond its mask and its orbit
+frame_data_generation = 0               # incremented each time the data of a frame is shared
+iterations_stream_columns = 256         # columns of the iterations converted at once when they are zipped
+iterate_points_numba = None             # compiled by the first use of the numba backend
+progressive_levels = (8, 4, 2, 1)       # one pixel out of level x level is calculated at each level
+antialiasing_max_gradient = 1           # pixels differing more from a neighbour are supersampled
+antialiasing_chunk_size = 4096          # refined pixels calculated by a task
+nearest_point_window = 32               # first radius searched around the center for the next one
+iterations_max_value = 65535            # iterations files store 16 bits per pixel
 
 
 
 
 
 # Functions
-def check_density(grid, width, height, threshold):
+def compute_density_threshold(iterations, centering_sigma):
 
-    density_map = None
-    if debug == ClassDebug.IMAGES_DENSITY:
-        density_map = Image.new("RGB", (width, height), (255, 255, 255))
-        density_pixels = density_map.load()
+    # Average plus centering_sigma standard deviations of the iterations, from their exact sums
+    nb_pixels = iterations.size
+    sum_iterations = int(iterations.sum(dtype=np.int64))
+    sum_squares = int(np.square(iterations, dtype=np.int64).sum())
+    iterations_average = sum_iterations / nb_pixels
+    variance = ((nb_pixels * sum_squares) - (sum_iterations ** 2)) / (nb_pixels ** 2)
 
-    interesting_pixels = [[0] * height for _ in range(width)]
+    return iterations_average + (centering_sigma * math.sqrt(variance))
 
-    for cnt_width in range(width):
-        for cnt_height in range(height):
-            pixel_interest = grid[cnt_width][cnt_height]
+def check_density(iterations, threshold):
 
-            if pixel_interest < threshold:
-                if debug == ClassDebug.IMAGES_DENSITY:
-                    density_pixels[cnt_width, cnt_height] = (255, 255, 255)
-            else:
-                if debug == ClassDebug.IMAGES_DENSITY:
-                    density_pixels[cnt_width, cnt_height] = (255, 0, 0)
-                interesting_pixels[cnt_width][cnt_height] = 1
-
-    return density_map, interesting_pixels
-
-def find_most_interesting_point(interesting_grid, width_grid, height_grid, center_x, center_y, up, down, left, right):
+    # Pixels at or above the threshold are interesting, by line and column
+    return iterations >= threshold
 
-    queue = deque([(center_x, center_y)])
-    visited = set()
-    visited.add((center_x, center_y))
+def reduce_density(interesting, scale):
 
-    directions = []
-    if up:
-        directions.append((0, 1))
-    if down:
-        directions.append((0, -1))
-    if left:
-        directions.append((-1, 0))
-    if right:
-        directions.append((1, 0))
+    # A block of scale x scale pixels is interesting when one of its pixels is
+    if scale == 1:
+        return interesting
+    size_y, size_x = interesting.shape
+    padded = np.zeros((-(-size_y // scale) * scale, -(-size_x // scale) * scale), dtype=bool)
+    padded[:size_y, :size_x] = interesting
+    return padded.reshape(padded.shape[0] // scale, scale, padded.shape[1] // scale, scale).any(axis=(1, 3))
 
-    while queue:
-        x, y = queue.popleft()
+def create_density_image(interesting):
 
-        if interesting_grid[x][y] == 1:
-            return x, y
+    # Interesting pixels are red, the others white
+    density_colors = np.full(interesting.shape + (3,), 255, dtype=np.uint8)
+    density_colors[interesting, 1:] = 0
+    return Image.fromarray(density_colors, "RGB")
 
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 <= nx < width_grid and 0 <= ny < height_grid and (nx, ny) not in visited:
-                visited.add((nx, ny))
-                queue.append((nx, ny))
+def find_most_interesting_point(interesting_grid, width_grid, height_grid, center_x, center_y, up, down, left, right):
 
-    return None
+    # Same point as a breadth-first search from the center with the allowed directions : the interesting pixel
+    # nearest in Manhattan distance, ties going to the one the search meets first (most vertical moves first,
+    # then in the order up, down, left, right). Windows growing around the center are searched, a point not
+    # further than the radius of the window cannot be beaten by a point outside of it.
+    min_x, max_x = (0 if left else center_x), ((width_grid - 1) if right else center_x)
+    min_y, max_y = (0 if down else center_y), ((height_grid - 1) if up else center_y)
+
+    radius = nearest_point_window
+    while True:
+        first_x, last_x = max(min_x, center_x - radius), min(max_x, center_x + radius)
+        first_y, last_y = max(min_y, center_y - radius), min(max_y, center_y + radius)
+        whole_area = (first_x, last_x, first_y, last_y) == (min_x, max_x, min_y, max_y)
+
+        cols, lines = np.nonzero(interesting_grid[first_x:last_x + 1, first_y:last_y + 1])
+        if cols.size > 0:
+            dx, dy = (cols + first_x - center_x), (lines + first_y - center_y)
+            distances = np.abs(dx) + np.abs(dy)
+            if whole_area or (distances.min() <= radius):
+                nearest = distances == distances.min()
+                dx, dy = dx[nearest], dy[nearest]
+                horizontal = np.where(dx < 0, 2, 3)
+                first_move = np.where(dy > 0, 0, np.where(dy < 0, 1, horizontal))
+                best = np.lexsort((horizontal, -np.abs(dy), first_move))[0]
+                return int(center_x + dx[best]), int(center_y + dy[best])
+
+        if whole_area:
+            return None
+        radius *= 2
 
 def adjust_precision(xmin, xmax, ymin, ymax, significant_digits):
 
@@ -343,6 +596,177 @@ def adjust_precision(xmin, xmax, ymin, ymax, significant_digits):
 
     return precision
 
+def next_viewport(inputs, frame, xmin, xmax, ymin, ymax):
+
+    # Area of the next image with the move and zoom options of this one (centering is applied before)
+    if inputs[frame].opt_move:
+
+        # Calculate next move
+        xmin += inputs[frame].move_x
+        xmax += inputs[frame].move_x
+        ymin += inputs[frame].move_y
+        ymax += inputs[frame].move_y
+
+    if inputs[frame].opt_zoom:
+
+        # Calculate next zoom
+        width = xmax - xmin
+        height = ymax - ymin
+        inverse_zoom = Decimal(1.0 - inputs[frame].zoom_amount)
+        xmin += ((width * inverse_zoom) / 2)
+        xmax -= ((width * inverse_zoom) / 2)
+        ymin += ((height * inverse_zoom) / 2)
+        ymax -= ((height * inverse_zoom) / 2)
+
+    # Manage case without zoom, neither centering, neither move
+    if not inputs[frame].opt_zoom and not inputs[frame].opt_centering and not inputs[frame].opt_move:
+        if frame < (len(inputs) - 1):
+            xmin = Decimal(inputs[frame + 1].xmin)
+            xmax = Decimal(inputs[frame + 1].xmax)
+            ymin = Decimal(inputs[frame + 1].ymin)
+            ymax = Decimal(inputs[frame + 1].ymax)
+
+    return xmin, xmax, ymin, ymax
+
+def plan_viewports(inputs, start_frame, xmin, xmax, ymin, ymax, significant_digits):
+
+    # Without centering, the areas of all the images are known before any calculation : the main loop is
+    # replayed, each step with the decimal precision of its image, so the areas are exactly the same
+    viewports = {}
+    for frame in range(start_frame, len(inputs)):
+        adjust_precision(xmin, xmax, ymin, ymax, significant_digits)
+        viewports[frame] = (xmin, xmax, ymin, ymax)
+        xmin, xmax, ymin, ymax = next_viewport(inputs, frame, xmin, xmax, ymin, ymax)
+
+    return viewports
+
+def group_sweeps(inputs, viewports, start_frame):
+
+    # Consecutive images with the same area and formula, only differing by max_iterations and colors, are
+    # calculated once with the highest max_iterations of the group. Returns the first image of the group
+    # of each image, and the max_iterations of each group.
+    sweep_leaders = {}
+    sweep_max_iterations = {}
+    leader = None
+    for frame in range(start_frame, len(inputs)):
+        if (leader is not None) and (viewports[frame] == viewports[leader]) and \
+                (inputs[frame].type_fractal == inputs[leader].type_fractal) and \
+                (inputs[frame].julia_a == inputs[leader].julia_a) and (inputs[frame].julia_b == inputs[leader].julia_b):
+            sweep_max_iterations[leader] = max(sweep_max_iterations[leader], inputs[frame].max_iterations)
+        else:
+            leader = frame
+            sweep_max_iterations[leader] = inputs[frame].max_iterations
+        sweep_leaders[frame] = leader
+
+    return sweep_leaders, sweep_max_iterations
+
+def derive_sweep_iterations(sweep_iterations, max_iterations):
+
+    # A point escaping at i <= max_iterations + 1 gives i for any max_iterations, the others stay inside the set
+    return np.where(sweep_iterations <= (max_iterations + 1), sweep_iterations, 0)
+
+def group_exponential_maps(inputs, viewports, start_frame, engine):
+
+    # Images of a zoom toward a fixed center (no move between them, same formula) are resampled from a single
+    # strip and their deepest image, when they have fewer points than the images themselves.
+    # Returns the first image of the group of each resampled image, and the strip of each group.
+    groups = []
+    for frame in range(start_frame, len(inputs)):
+        previous = frame - 1
+        if (len(groups) > 0) and (groups[-1][-1] == previous) and inputs[previous].opt_zoom and \
+                not inputs[previous].opt_move and \
+                (inputs[frame].type_fractal == inputs[groups[-1][0]].type_fractal) and \
+                (inputs[frame].julia_a == inputs[groups[-1][0]].julia_a) and \
+                (inputs[frame].julia_b == inputs[groups[-1][0]].julia_b):
+            groups[-1].append(frame)
+        else:
+            groups.append([frame])
+
+    exponential_leaders = {}
+    exponential_strips = {}
+    for frames in groups:
+        if len(frames) < 2:
+            continue
+        strip = prepare_strip(frames, inputs, viewports, engine)
+        if (strip is None) or (((strip.nb_radii * strip.nb_angles) + (parameters.size_x * parameters.size_y)) >=
+                               (len(frames) * parameters.size_x * parameters.size_y)):
+            continue
+        exponential_strips[frames[0]] = strip
+        for frame in frames:
+            exponential_leaders[frame] = frames[0]
+
+    return exponential_leaders, exponential_strips
+
+def prepare_strip(frames, inputs, viewports, engine):
+
+    # The deepest image is calculated normally, the strip covers the rest of the images : radii on a logarithmic
+    # scale from the circle inscribed in the deepest image to the farthest corner, angles with the resolution of
+    # the pixels at this corner. Both have the same step, samples are square.
+    # Returns None when the deepest image needs decimal calculations.
+    with localcontext():
+        precision = max(adjust_precision(*viewports[frame], parameters.adaptive_decimal_precision) for frame in frames)
+        getcontext().prec = precision
+
+        strip = ClassStrip()
+        strip.frames = frames
+        xmin, xmax, ymin, ymax = viewports[frames[0]]
+        strip.center_x, strip.center_y = (xmin + xmax) / 2, (ymin + ymax) / 2
+
+        pixel_sizes = []
+        corner_radii = []
+        for frame in frames:
+            xmin, xmax, ymin, ymax = viewports[frame]
+            pixel_sizes.append(min(float(xmax - xmin) / parameters.size_x, float(ymax - ymin) / parameters.size_y))
+            corner_radii.append(math.hypot(max(abs(float(xmin - strip.center_x)), abs(float(xmax - strip.center_x))),
+                                           max(abs(float(ymin - strip.center_y)), abs(float(ymax - strip.center_y)))))
+
+    strip.inner_frame = frames[int(np.argmin(pixel_sizes))]
+    strip.inner_viewport = viewports[strip.inner_frame]
+    xmin, xmax, ymin, ymax = strip.inner_viewport
+    inner_radius = min(float(xmax - xmin), float(ymax - ymin)) / 2
+
+    strip.nb_angles = math.ceil(max(2 * math.pi * radius / size for radius, size in zip(corner_radii, pixel_sizes)))
+    strip.step = 2 * math.pi / strip.nb_angles
+    strip.log_radius_min = math.log(inner_radius) - strip.step
+    strip.nb_radii = math.ceil((math.log(max(corner_radii)) - strip.log_radius_min) / strip.step) + 1
+
+    # The strip has no axes : beyond double precision, points are offsets to the center with perturbation
+    frame_data = ClassFrame()
+    frame_data.index = frames[0]
+    frame_data.type_fractal = inputs[frames[0]].type_fractal
+    frame_data.max_iterations = max(inputs[frame].max_iterations for frame in frames)
+    frame_data.julia_a = inputs[frames[0]].julia_a
+    frame_data.julia_b = inputs[frames[0]].julia_b
+    frame_data.precision = precision
+    if engine == ClassEngine.NUMPY:
+        frame_data.tier = ClassPrecisionTier.FLOAT64
+    elif engine == ClassEngine.PERTURBATION:
+        frame_data.tier = ClassPrecisionTier.PERTURBATION
+    else:
+        frame_data.tier = select_precision_tier(precision)
+        if frame_data.tier == ClassPrecisionTier.EXTENDED:
+            frame_data.tier = ClassPrecisionTier.PERTURBATION
+        elif frame_data.tier == ClassPrecisionTier.ARBITRARY:
+            return None
+    strip.frame_data = frame_data
+
+    return strip
+
+def prepare_mapped_frame(frame, inputs, viewport, strip):
+
+    # Area and precision of an image resampled from a strip, for the logs and the next areas
+    frame_data = ClassFrame()
+    frame_data.index = frame
+    frame_data.type_fractal = inputs[frame].type_fractal
+    frame_data.max_iterations = inputs[frame].max_iterations
+    frame_data.julia_a = inputs[frame].julia_a
+    frame_data.julia_b = inputs[frame].julia_b
+    frame_data.xmin, frame_data.xmax, frame_data.ymin, frame_data.ymax = viewport
+    frame_data.precision = adjust_precision(*viewport, parameters.adaptive_decimal_precision)
+    frame_data.tier = strip.frame_data.tier
+
+    return frame_data
+
 def ReadInputsFile(inputs_filepath):
     try:
         with open(inputs_filepath, mode="r", newline="", encoding="utf-8") as file:
@@ -422,13 +846,21 @@ def ReadInputsFile(inputs_filepath):
     except:
         return []
 
-def process_line(line, parameters, inputs, frame, xmin, xmax, ymin, ymax, cores_percent_manager, cpu_limit):
+def check_max_iterations(inputs):
+
+    # Points escaping at max_iterations + 1 must still fit in the iterations files
+    for index, local_inputs in enumerate(inputs):
+        if (local_inputs.max_iterations + 1) > iterations_max_value:
+            print(f"Error with Inputs file, max_iterations of image {(index + 1)} is above "
+                  f"{(iterations_max_value - 1)}, the iterations files store 16 bits per pixel.")
+            return False
+    return True
+
+def process_line(line, parameters, inputs, frame, xmin, xmax, ymin, ymax, throttle):
     line_pixels = []
     line_iterations = []
 
-    if cpu_limit < 100:
-        while psutil.cpu_percent(interval=0.0001) > cpu_limit:
-            time.sleep(0.4)
+    throttle.wait()
 
     for col in range(parameters.size_x):
 
@@ -474,30 +906,1266 @@ def process_line(line, parameters, inputs, frame, xmin, xmax, ymin, ymax, cores_
                 line_iterations.append(i)
 
 
-    with lock_cores_percent:
-        cores_percent_manager['cnt_points'] += cores_percent_manager['nb_points_per_update']
-        current_percent_points = f"{int(cores_percent_manager['cnt_points'] / cores_percent_manager['nb_points'] * 100)}"
-        if current_percent_points != cores_percent_manager['string_percent_points']:
-            print("", end="\r")
-            print(f"{(cores_percent_manager['cnt_images'] + 1)}/{cores_percent_manager['nb_images']}, "
-                  f"{current_percent_points}%", end="")
-            cores_percent_manager['string_percent_points'] = current_percent_points
+    update_progress(parameters.size_x)
 
     return line_pixels, line_iterations
 
-def process_block(block_range, parameters, inputs, frame, xmin, xmax, ymin, ymax, cores_percent_manager, cpu_limit):
-    min_line, max_line = block_range
-    block_pixels = []
-    block_iterations = []
+def update_progress(nb_new_points):
+    # Only this worker writes in its counter, the main process displays the total
+    worker_context.progress_counters[worker_context.progress_slot] += nb_new_points
+
+def compute_iterations_numpy(zx, zy, cx, cy, max_iterations, start=1, keep_state=False):
+
+    # Same escape rule as process_line, but for a whole array of points at once.
+    # Only the points still iterating are kept in the working arrays ("active" holds their flat indexes).
+    # An orbit saved after max_iterations can be continued later with start = max_iterations + 1,
+    # keep_state also returns the z of the points still iterating at the end (NaN for the others).
+    shape = np.shape(zx)
+    iterations = np.zeros(shape, dtype=np.uint32).ravel()
+    zx = np.array(zx).ravel()
+    zy = np.array(zy).ravel()
+    active = np.arange(zx.size)
+
+    c_per_point = np.ndim(cx) > 0       # mandelbrot: one c per point, julia: one c for all points
+    if c_per_point:
+        cx = np.array(cx).ravel()
+        cy = np.array(cy).ravel()
+
+    # Orbits coming back exactly to a saved value are periodic : they will never escape (Brent's method)
+    saved_x, saved_y = zx.copy(), zy.copy()
+
+    i = start
+    while i <= max_iterations and active.size > 0:
+        zx_squared = zx * zx
+        zy_squared = zy * zy
+
+        escaped = (zx_squared + zy_squared) > 4
+        periodic = (zx == saved_x) & (zy == saved_y) & (i > start)
+        stopped = escaped | periodic
+        if stopped.any():
+            iterations[active[escaped]] = i
+            still_active = ~stopped
+            active = active[still_active]
+            zx, zy = zx[still_active], zy[still_active]
+            zx_squared, zy_squared = zx_squared[still_active], zy_squared[still_active]
+            saved_x, saved_y = saved_x[still_active], saved_y[still_active]
+            if c_per_point:
+                cx, cy = cx[still_active], cy[still_active]
+
+        if (i & (i - 1)) == 0:
+            saved_x, saved_y = zx, zy
+
+        zy = 2 * zx * zy + cy
+        zx = zx_squared - zy_squared + cx
+        i += 1
+
+    # Points escaping exactly on the last iteration keep max_iterations + 1, the others stay at 0 (black)
+    escaped = (zx * zx + zy * zy) > 4
+    iterations[active[escaped]] = max_iterations + 1
+
+    if keep_state:
+        state_x = np.full(iterations.size, np.nan)
+        state_y = np.full(iterations.size, np.nan)
+        state_x[active[~escaped]] = zx[~escaped]
+        state_y[active[~escaped]] = zy[~escaped]
+        return iterations.reshape(shape), state_x.reshape(shape), state_y.reshape(shape)
+
+    return iterations.reshape(shape)
+
+def iterate_points(zx, zy, cx, cy, max_iterations, start, iterations, state_x, state_y):
+
+    # Point by point version of compute_iterations_numpy, in plain python. It is also compiled by numba when
+    # it is installed. States of the points still iterating are written in state_x and state_y.
+    for point in range(zx.size):
+        x, y = zx[point], zy[point]
+        a, b = cx[point], cy[point]
+        saved_x, saved_y = x, y
+        running = True
+
+        i = start
+        while i <= max_iterations:
+            x_squared = x * x
+            y_squared = y * y
+            if (x_squared + y_squared) > 4:
+                iterations[point] = i
+                running = False
+                break
+            if i > start and x == saved_x and y == saved_y:
+                running = False
+                break
+            if (i & (i - 1)) == 0:
+                saved_x, saved_y = x, y
+            y = 2 * x * y + b
+            x = x_squared - y_squared + a
+            i += 1
+
+        if running:
+            if (x * x + y * y) > 4:
+                iterations[point] = max_iterations + 1
+            else:
+                state_x[point] = x
+                state_y[point] = y
+
+def run_iterate_points(iterate_function, zx, zy, cx, cy, max_iterations, start=1, keep_state=False):
+
+    # Same arguments and results as compute_iterations_numpy, for the point by point backends
+    shape = np.shape(zx)
+    zx = np.ascontiguousarray(zx, dtype=np.float64).ravel()
+    zy = np.ascontiguousarray(zy, dtype=np.float64).ravel()
+    cx = np.ascontiguousarray(np.broadcast_to(cx, shape), dtype=np.float64).ravel()
+    cy = np.ascontiguousarray(np.broadcast_to(cy, shape), dtype=np.float64).ravel()
+
+    iterations = np.zeros(zx.size, dtype=np.uint32)
+    state_x = np.full(zx.size, np.nan)
+    state_y = np.full(zx.size, np.nan)
+    iterate_function(zx, zy, cx, cy, max_iterations, start, iterations, state_x, state_y)
+
+    if keep_state:
+        return iterations.reshape(shape), state_x.reshape(shape), state_y.reshape(shape)
+    return iterations.reshape(shape)
+
+def compute_iterations_python(zx, zy, cx, cy, max_iterations, start=1, keep_state=False):
+    return run_iterate_points(iterate_points, zx, zy, cx, cy, max_iterations, start, keep_state)
+
+def compute_iterations_numba(zx, zy, cx, cy, max_iterations, start=1, keep_state=False):
+    global iterate_points_numba
+
+    # Compiled once per process, at the first use
+    if iterate_points_numba is None:
+        iterate_points_numba = numba.njit(cache=True)(iterate_points)
+    return run_iterate_points(iterate_points_numba, zx, zy, cx, cy, max_iterations, start, keep_state)
+
+def get_kernel_backends():
+
+    # Backends of the double precision kernel, the optional ones only when their package is installed
+    kernel_backends = {"python": compute_iterations_python, "numpy": compute_iterations_numpy}
+    if numba is not None:
+        kernel_backends["numba"] = compute_iterations_numba
+    return kernel_backends
+
+def select_kernel_backend(name):
+
+    # 'auto' takes the fastest backend installed, an unknown or missing backend falls back to numpy
+    if name == "auto":
+        return "numba" if "numba" in get_kernel_backends() else "numpy"
+    if name not in get_kernel_backends():
+        print(f"Kernel backend '{name}' is not available, numpy is used.")
+        return "numpy"
+    return name
+
+def select_iterations_compression(method, level):
+
+    # Compression of the iterations files, an unknown method or level falls back to deflated level 9
+    if method not in iterations_compressions:
+        print(f"Iterations compression '{method}' is not available, deflated is used.")
+        return "deflated", 9
+    if (method in iterations_compression_levels) and (level not in iterations_compression_levels[method]):
+        print(f"Compression level {level} is not available with {method}, level 9 is used.")
+        return method, 9
+    return method, level
+
+def check_kernel_backends():
+
+    # Every backend must give the same iterations and states as the python reference, on mandelbrot and julia
+    # points, calculated at once or continued from a state. Also measures the speed of each backend.
+    # Returns the exit code.
+    x, y = np.meshgrid(np.linspace(-2.2, 0.8, 96), np.linspace(1.2, -1.2, 64))
+    cases = [(np.zeros(x.shape), np.zeros(y.shape), x, y), (x / 2, y / 2, np.float64(-0.8), np.float64(0.156))]
+    max_iterations = (100, 300)
+
+    def run_cases(compute_iterations):
+        results = []
+        for zx, zy, cx, cy in cases:
+            results.append(compute_iterations(zx, zy, cx, cy, max_iterations[1], keep_state=True))
+            iterations, state_x, state_y = compute_iterations(zx, zy, cx, cy, max_iterations[0], keep_state=True)
+            running = ~np.isnan(state_x)
+            continued = compute_iterations(state_x[running], state_y[running], np.broadcast_to(cx, x.shape)[running],
+                                           np.broadcast_to(cy, x.shape)[running], max_iterations[1],
+                                           start=(max_iterations[0] + 1), keep_state=True)
+            iterations[running], state_x[running], state_y[running] = continued
+            results.append((iterations, state_x, state_y))
+        return results
+
+    exit_code = 0
+    reference_results = run_cases(compute_iterations_python)
+    for name, compute_iterations in get_kernel_backends().items():
+        run_cases(compute_iterations)       # compilation and caches are not measured
+        start_time = time.perf_counter()
+        results = run_cases(compute_iterations)
+        duration = time.perf_counter() - start_time
+
+        nb_differences = 0
+        for reference_result, result in zip(reference_results, results):
+            nb_differences += int(np.count_nonzero(reference_result[0] != result[0]))
+            nb_differences += int(np.count_nonzero(~((reference_result[1] == result[1]) |
+                                                      (np.isnan(reference_result[1]) & np.isnan(result[1])))))
+            nb_differences += int(np.count_nonzero(~((reference_result[2] == result[2]) |
+                                                      (np.isnan(reference_result[2]) & np.isnan(result[2])))))
+        if nb_differences > 0:
+            exit_code = 1
+
+        nb_points = 4 * x.size
+        print(f"{name}: {'conform' if nb_differences == 0 else f'{nb_differences} differences'};"
+              f"{(nb_points / duration / 1e6):.3f} Mpoints/s")
+
+    return exit_code
+
+def select_precision_tier(precision):
+
+    # Cheapest numeric type still giving the number of significant digits required by adjust_precision
+    if precision <= np.finfo(np.float64).precision:
+        return ClassPrecisionTier.FLOAT64
+    if precision <= np.finfo(np.longdouble).precision:
+        return ClassPrecisionTier.EXTENDED
+    if precision <= perturbation_max_precision:
+        return ClassPrecisionTier.PERTURBATION
+    return ClassPrecisionTier.ARBITRARY
+
+def convert_to_tier(value, tier):
+    if tier in (ClassPrecisionTier.FLOAT64, ClassPrecisionTier.PERTURBATION):
+        return np.float64(value)
+    if tier == ClassPrecisionTier.EXTENDED:
+        return np.longdouble(str(value))     # parse the string to keep the extra digits
+    return Decimal(value)
+
+def compute_axes(xmin, xmax, ymin, ymax, size_x, size_y, tier):
+
+    # Same expressions as process_line, evaluated once per frame with the current decimal precision
+    x_axis = [xmin + col * (xmax - xmin) / size_x for col in range(size_x)]
+    y_axis = [ymax - line * (ymax - ymin) / size_y for line in range(size_y)]
+
+    if tier == ClassPrecisionTier.FLOAT64:
+        return np.array(x_axis, dtype=np.float64), np.array(y_axis, dtype=np.float64)
+    if tier == ClassPrecisionTier.EXTENDED:
+        return (np.array([np.longdouble(str(x)) for x in x_axis], dtype=np.longdouble),
+                np.array([np.longdouble(str(y)) for y in y_axis], dtype=np.longdouble))
+    return x_axis, y_axis
+
+def prepare_frame(frame, inputs, xmin, xmax, ymin, ymax, precision, engine, max_iterations):
+    frame_data = ClassFrame()
+    frame_data.index = frame
+    frame_data.type_fractal = inputs[frame].type_fractal
+    frame_data.max_iterations = max_iterations
+    frame_data.julia_a = inputs[frame].julia_a
+    frame_data.julia_b = inputs[frame].julia_b
+    frame_data.xmin, frame_data.xmax = xmin, xmax
+    frame_data.ymin, frame_data.ymax = ymin, ymax
+    frame_data.precision = precision
+
+    if engine == ClassEngine.AUTO:
+        frame_data.tier = select_precision_tier(precision)
+    elif engine == ClassEngine.NUMPY:
+        frame_data.tier = ClassPrecisionTier.FLOAT64
+    elif engine == ClassEngine.PERTURBATION:
+        frame_data.tier = ClassPrecisionTier.PERTURBATION
+    else:
+        frame_data.tier = ClassPrecisionTier.ARBITRARY
+        return frame_data       # the reference engine computes its coordinates pixel by pixel
 
-    for line in range(min_line, max_line):
-        line_pixels, line_iterations = process_line(line, parameters=parameters, inputs=inputs, frame=frame,
-                                                    xmin=xmin, xmax=xmax, ymin=ymin, ymax=ymax,
-                                                    cores_percent_manager=cores_percent_manager, cpu_limit=cpu_limit)
-        block_pixels.append(line_pixels)
-        block_iterations.append(line_iterations)
+    if frame_data.tier == ClassPrecisionTier.PERTURBATION:
 
-    return block_pixels, block_iterations
+        # The center pixel is the main reference, other pixels only keep their offset to it
+        x_axis, y_axis = compute_axes(xmin, xmax, ymin, ymax, parameters.size_x, parameters.size_y,
+                                      ClassPrecisionTier.ARBITRARY)
+        ref_x = x_axis[parameters.size_x // 2]
+        ref_y = y_axis[parameters.size_y // 2]
+        frame_data.x_axis = np.array([float(x - ref_x) for x in x_axis], dtype=np.float64)
+        frame_data.y_axis = np.array([float(y - ref_y) for y in y_axis], dtype=np.float64)
+        frame_data.reference = compute_reference_orbit(ref_x, ref_y, frame_data)
+        compute_series_coefficients(frame_data.reference, frame_data)
+
+        return frame_data
+
+    frame_data.x_axis, frame_data.y_axis = compute_axes(xmin, xmax, ymin, ymax, parameters.size_x, parameters.size_y,
+                                                        frame_data.tier)
+    prepare_symmetry(frame_data)
+
+    return frame_data
+
+def compute_mirror(axis):
+
+    # Index of the exact opposite of each coordinate of the axis, -1 when it is not on the axis
+    positions = {value: index for index, value in enumerate(axis)}
+    return np.array([positions.get(-value, -1) for value in axis], dtype=np.int64)
+
+def prepare_symmetry(frame_data):
+
+    # Julia sets are symmetric under z -> -z, the mandelbrot set about the real axis.
+    # Pixels whose exact mirror is also in the image are copied from it instead of being calculated,
+    # the orbits of mirrored points only differ by signs so the iterations are the same.
+    mirror_lines = compute_mirror(frame_data.y_axis)
+    y_negative = np.array([y < 0 for y in frame_data.y_axis], dtype=bool)
+
+    if frame_data.type_fractal == ClassTypeFractal.JULIA:
+        mirror_cols = compute_mirror(frame_data.x_axis)
+        y_zero = np.array([y == 0 for y in frame_data.y_axis], dtype=bool)
+        x_negative = np.array([x < 0 for x in frame_data.x_axis], dtype=bool)
+        mirrored = (((mirror_lines >= 0) & (y_negative | y_zero))[:, np.newaxis] & (mirror_cols >= 0)[np.newaxis, :]
+                    & (y_negative[:, np.newaxis] | x_negative[np.newaxis, :]))
+    else:
+        mirror_cols = np.arange(len(frame_data.x_axis), dtype=np.int64)
+        mirrored = np.repeat(((mirror_lines >= 0) & y_negative)[:, np.newaxis], len(frame_data.x_axis), axis=1)
+
+    if mirrored.any():
+        frame_data.mirror_cols = mirror_cols
+        frame_data.mirror_lines = mirror_lines
+        frame_data.mirrored = mirrored
+
+def apply_symmetry(iterations, frame_data):
+    if frame_data.mirrored is None:
+        return
+    lines, cols = np.nonzero(frame_data.mirrored)
+    iterations[lines, cols] = iterations[frame_data.mirror_lines[lines], frame_data.mirror_cols[cols]]
+
+def apply_symmetry_state(state_frame, frame_data):
+
+    # Mirrored mandelbrot orbits are conjugated, julia orbits are the same after the first iteration
+    if frame_data.mirrored is None:
+        return
+    lines, cols = np.nonzero(frame_data.mirrored)
+    state_frame[:, lines, cols] = state_frame[:, frame_data.mirror_lines[lines], frame_data.mirror_cols[cols]]
+    if frame_data.type_fractal == ClassTypeFractal.MANDELBROT:
+        state_frame[1, lines, cols] = -state_frame[1, lines, cols]
+
+def extract_state(state_frame, frame_data):
+
+    # Points still iterating after max_iterations, with what is needed to continue them later
+    indexes = np.flatnonzero(~np.isnan(state_frame[0]))
+    return {"max_iterations": np.int64(frame_data.max_iterations),
+            "mandelbrot": np.bool_(frame_data.type_fractal == ClassTypeFractal.MANDELBROT),
+            "julia": np.array([float(frame_data.julia_a), float(frame_data.julia_b)], dtype=np.float64),
+            "x_axis": frame_data.x_axis,
+            "y_axis": frame_data.y_axis,
+            "indexes": indexes.astype(np.uint32),
+            "zx": state_frame[0].ravel()[indexes],
+            "zy": state_frame[1].ravel()[indexes]}
+
+def compute_reference_orbit(ref_x, ref_y, frame_data):
+
+    # High precision orbit of a single point, stored in double precision for perturbation
+    reference = ClassReferenceOrbit()
+    reference.x = ref_x
+    reference.y = ref_y
+
+    if frame_data.type_fractal == ClassTypeFractal.JULIA:
+        x, y = ref_x, ref_y
+        a, b = frame_data.julia_a, frame_data.julia_b
+    else:
+        x, y = Decimal(0), Decimal(0)
+        a, b = ref_x, ref_y
+
+    orbit_x = [float(x)]
+    orbit_y = [float(y)]
+    i = 1
+    while i <= frame_data.max_iterations and (x ** 2 + y ** 2) <= 4:
+        stock = x
+        x = x ** 2 - y ** 2 + a
+        y = 2 * stock * y + b
+        orbit_x.append(float(x))
+        orbit_y.append(float(y))
+        i += 1
+
+    reference.orbit_x = np.array(orbit_x, dtype=np.float64)
+    reference.orbit_y = np.array(orbit_y, dtype=np.float64)
+
+    return reference
+
+def compute_series_coefficients(reference, frame_data):
+
+    # dz(n) ~ A(n).d + B(n).d^2 + C(n).d^3, with d the offset of c (mandelbrot) or of z0 (julia) to the reference.
+    # D(n).d^4 is the first neglected term.
+    orbit = reference.orbit_x + 1j * reference.orbit_y
+    series_a = np.zeros(orbit.size, dtype=np.complex128)
+    series_b = np.zeros(orbit.size, dtype=np.complex128)
+    series_c = np.zeros(orbit.size, dtype=np.complex128)
+    series_d = np.zeros(orbit.size, dtype=np.complex128)
+
+    a, b, c, d = (1, 0, 0, 0) if frame_data.type_fractal == ClassTypeFractal.JULIA else (0, 0, 0, 0)
+    constant = 0 if frame_data.type_fractal == ClassTypeFractal.JULIA else 1
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        for n in range(orbit.size):
+            series_a[n], series_b[n], series_c[n], series_d[n] = a, b, c, d
+            z = 2 * orbit[n]
+            a, b, c, d = (z * a + constant), (z * b + a * a), (z * c + 2 * a * b), (z * d + 2 * a * c + b * b)
+
+    reference.series_a = series_a
+    reference.series_b = series_b
+    reference.series_c = series_c
+    reference.series_d = series_d
+
+def select_series_skip(reference, radius, frame_data):
+
+    # Last iteration for which the terms of third and fourth order stay negligible against the first ones for
+    # every point of the block, and the approximated offsets stay small
+    if reference.series_a is None or radius == 0:
+        return 0
+
+    # Points escaping before the skip could come back under the bailout only if |c| > 2
+    if frame_data.type_fractal == ClassTypeFractal.JULIA:
+        c_modulus = abs(complex(frame_data.julia_a, frame_data.julia_b))
+    else:
+        c_modulus = abs(complex(reference.x, reference.y)) + radius
+    if c_modulus > 2:
+        return 0
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        term_a = np.abs(reference.series_a) * radius
+        term_b = np.abs(reference.series_b) * radius ** 2
+        term_c = np.abs(reference.series_c) * radius ** 3
+        term_d = np.abs(reference.series_d) * radius ** 4
+        kept = np.maximum(term_a, term_b)
+        valid = (term_c <= (series_tolerance * kept)) & (term_d <= (series_tolerance * kept))
+        valid &= (term_a + term_b + term_c) <= series_max_delta
+
+        # Without first order term (julia reference at the origin), the even terms are the series itself
+        valid &= ~((term_a <= (series_tolerance * term_b)) & (term_b > 0))
+        valid &= np.isfinite(reference.series_a) & np.isfinite(reference.series_b) & np.isfinite(reference.series_c)
+        valid &= np.isfinite(reference.series_d)
+
+    invalid = np.flatnonzero(~valid)
+    skip = (invalid[0] - 1) if invalid.size > 0 else (valid.size - 1)
+
+    return int(max(0, min(skip, frame_data.max_iterations)))
+
+def apply_series_skip(reference, dx, dy, frame_data):
+
+    # First iteration of each point and its offset to the reference there, after the iterations skipped with
+    # the series approximation (dx and dy are the offsets of the points to the reference)
+    start = np.zeros(dx.size, dtype=np.int64)
+    dz_start = np.zeros(dx.size, dtype=np.complex128)
+
+    skip = select_series_skip(reference, float(np.sqrt(np.max(dx ** 2 + dy ** 2, initial=0.0))), frame_data)
+    if skip > 0:
+        d = dx + 1j * dy
+        dz_start = reference.series_a[skip] * d + reference.series_b[skip] * d ** 2 + reference.series_c[skip] * d ** 3
+        z = (reference.orbit_x[skip] + 1j * reference.orbit_y[skip]) + dz_start
+        skipped = (z.real ** 2 + z.imag ** 2) <= 4     # the others escaped early, they are iterated from the start
+        start[skipped] = skip
+        dz_start[~skipped] = 0
+
+    return start, dz_start
+
+def iterate_perturbation(dzx, dzy, dcx, dcy, reference, max_iterations, iterations, indexes, start=0):
+
+    # Iterate the offsets to the reference orbit : dz' = 2.Z.dz + dz^2 + dc
+    # Returns the indexes of glitched points, which need another reference, with a score to choose it
+    orbit_x, orbit_y = reference.orbit_x, reference.orbit_y
+    last = len(orbit_x) - 1
+    active = indexes
+    glitched = []
+    glitched_scores = []
+
+    c_per_point = np.ndim(dcx) > 0
+
+    # Orbits coming back exactly to a saved value are periodic : they will never escape (Brent's method)
+    saved_x = orbit_x[start] + dzx
+    saved_y = orbit_y[start] + dzy
+
+    n = start
+    i = start + 1
+    while i <= max_iterations and active.size > 0:
+        zx = orbit_x[n] + dzx
+        zy = orbit_y[n] + dzy
+        magnitude = zx * zx + zy * zy
+        reference_magnitude = orbit_x[n] * orbit_x[n] + orbit_y[n] * orbit_y[n]
+
+        escaped = magnitude > 4
+        glitch = ~escaped & (magnitude < (perturbation_glitch_tolerance ** 2) * reference_magnitude)
+        periodic = ~escaped & ~glitch & (zx == saved_x) & (zy == saved_y) & (i > (start + 1))
+        stopped = escaped | glitch | periodic
+
+        if stopped.any():
+            iterations[active[escaped]] = i
+            glitched.append(active[glitch])
+            glitched_scores.append(magnitude[glitch] / reference_magnitude)
+
+            still_active = ~stopped
+            active = active[still_active]
+            dzx, dzy = dzx[still_active], dzy[still_active]
+            zx, zy = zx[still_active], zy[still_active]
+            saved_x, saved_y = saved_x[still_active], saved_y[still_active]
+            if c_per_point:
+                dcx, dcy = dcx[still_active], dcy[still_active]
+
+        # The reference escaped before these points : they need another reference
+        if n == last and active.size > 0:
+            glitched.append(active)
+            glitched_scores.append(np.full(active.size, np.inf))
+            return np.concatenate(glitched), np.concatenate(glitched_scores)
+
+        if (i & (i - 1)) == 0:
+            saved_x, saved_y = zx, zy
+
+        stock = dzx
+        dzx = 2 * (orbit_x[n] * dzx - orbit_y[n] * dzy) + dzx * dzx - dzy * dzy + dcx
+        dzy = 2 * (orbit_x[n] * dzy + orbit_y[n] * stock) + 2 * stock * dzy + dcy
+        n += 1
+        i += 1
+
+    if active.size > 0:
+        zx = orbit_x[n] + dzx
+        zy = orbit_y[n] + dzy
+        escaped = (zx * zx + zy * zy) > 4
+        iterations[active[escaped]] = max_iterations + 1
+
+    if len(glitched) == 0:
+        return np.array([], dtype=np.int64), np.array([], dtype=np.float64)
+    return np.concatenate(glitched), np.concatenate(glitched_scores)
+
+def compute_iterations_perturbation(delta_x, delta_y, frame_data):
+
+    # delta_x and delta_y are the offsets of the points to the main reference of the frame
+    shape = np.shape(delta_x)
+    delta_x = np.array(delta_x, dtype=np.float64).ravel()
+    delta_y = np.array(delta_y, dtype=np.float64).ravel()
+    iterations = np.zeros(delta_x.size, dtype=np.uint32)
+
+    reference = frame_data.reference
+    offset_x, offset_y = 0.0, 0.0
+    pending = np.arange(delta_x.size)
+    julia = frame_data.type_fractal == ClassTypeFractal.JULIA
+
+    # Points inside the main cardioid or the period 2 bulb are not iterated. In double precision, the tests are
+    # only certain for the points far enough from the edges, the others are iterated.
+    if not julia:
+        interior = check_mandelbrot_interior(float(reference.x) + delta_x, float(reference.y) + delta_y,
+                                             perturbation_interior_margin)
+        pending = np.flatnonzero(~interior)
+        if pending.size == 0:
+            return iterations.reshape(shape)
+
+    # Skip the first iterations of the main reference with the series approximation
+    start, dz_start = apply_series_skip(reference, delta_x, delta_y, frame_data)
+
+    for cnt_references in range(perturbation_max_references):
+        dx = delta_x[pending] - offset_x
+        dy = delta_y[pending] - offset_y
+
+        glitched, scores = [], []
+        for group_start in np.unique(start[pending]):
+            group = start[pending] == group_start
+            if julia:
+                if group_start > 0:
+                    dzx, dzy = dz_start[pending][group].real, dz_start[pending][group].imag
+                else:
+                    dzx, dzy = dx[group], dy[group]
+                group_glitched, group_scores = iterate_perturbation(dzx, dzy, 0.0, 0.0, reference,
+                                                                    frame_data.max_iterations, iterations,
+                                                                    pending[group], start=int(group_start))
+            else:
+                group_glitched, group_scores = iterate_perturbation(dz_start[pending][group].real,
+                                                                    dz_start[pending][group].imag,
+                                                                    dx[group], dy[group], reference,
+                                                                    frame_data.max_iterations, iterations,
+                                                                    pending[group], start=int(group_start))
+            glitched.append(group_glitched)
+            scores.append(group_scores)
+
+        pending, scores = np.concatenate(glitched), np.concatenate(scores)
+
+        # Without another pass to use it, no new reference is calculated for the points still glitched
+        if (pending.size == 0) or (cnt_references == (perturbation_max_references - 1)):
+            break
+
+        # Rebase glitched points onto a secondary reference chosen among them
+        new_reference = pending[np.argmin(scores)]
+        offset_x, offset_y = delta_x[new_reference], delta_y[new_reference]
+        reference = compute_reference_orbit(frame_data.reference.x + Decimal(offset_x),
+                                            frame_data.reference.y + Decimal(offset_y), frame_data)
+
+        # With their own series, the first iterations are also skipped around the secondary reference
+        compute_series_coefficients(reference, frame_data)
+        start[pending], dz_start[pending] = apply_series_skip(reference, delta_x[pending] - offset_x,
+                                                              delta_y[pending] - offset_y, frame_data)
+
+    # Last resort for points still glitched : full decimal calculation
+    for point in pending:
+        iterations[point] = compute_point_decimal(frame_data.reference.x + Decimal(delta_x[point]),
+                                                  frame_data.reference.y + Decimal(delta_y[point]), frame_data)
+
+    return iterations.reshape(shape)
+
+def check_mandelbrot_interior(x, y, margin=0):
+
+    # Analytic tests for the main cardioid and the period 2 bulb (on arrays or on decimals).
+    # With a margin, only the points inside by more than it are kept.
+    if isinstance(x, Decimal):
+        one_quarter, one_sixteenth = Decimal("0.25"), Decimal("0.0625")
+    else:
+        one_quarter, one_sixteenth = 0.25, 0.0625
+
+    q = (x - one_quarter) ** 2 + y ** 2
+    in_cardioid = (q * (q + (x - one_quarter))) <= ((y ** 2 / 4) - margin)
+    in_bulb = ((x + 1) ** 2 + y ** 2) <= (one_sixteenth - margin)
+
+    return in_cardioid | in_bulb
+
+def compute_point_decimal(x, y, frame_data):
+    i = 1
+    if frame_data.type_fractal == ClassTypeFractal.JULIA:
+        a = frame_data.julia_a
+        b = frame_data.julia_b
+    else:
+        if check_mandelbrot_interior(x, y):
+            return 0
+        a = x
+        b = y
+        x = 0
+        y = 0
+
+    saved_x, saved_y = x, y
+    while i <= frame_data.max_iterations and (x ** 2 + y ** 2) <= 4:
+
+        # Periodic orbit, the point will never escape
+        if i > 1 and x == saved_x and y == saved_y:
+            return 0
+        if (i & (i - 1)) == 0:
+            saved_x, saved_y = x, y
+
+        stock = x
+        x = x ** 2 - y ** 2 + a
+        y = 2 * stock * y + b
+        i += 1
+
+    if i > frame_data.max_iterations and (x ** 2 + y ** 2) <= 4:
+        return 0
+    return i
+
+def compute_pixels(frame_data, cols, lines, keep_state=False):
+
+    # Iterations for any set of pixels of the frame, with the numeric tier chosen for it.
+    # keep_state (float64 tier only) also returns the z of the points still iterating.
+    cols = np.asarray(cols)
+    lines = np.asarray(lines)
+
+    if frame_data.tier == ClassPrecisionTier.ARBITRARY:
+        iterations = np.zeros(cols.shape, dtype=np.uint32)
+        for index, (col, line) in enumerate(zip(cols.ravel(), lines.ravel())):
+            iterations.flat[index] = compute_point_decimal(frame_data.x_axis[col], frame_data.y_axis[line], frame_data)
+        return iterations
+
+    return compute_points(frame_data, frame_data.x_axis[cols], frame_data.y_axis[lines], keep_state)
+
+def compute_points(frame_data, x, y, keep_state=False):
+
+    # Iterations for arrays of coordinates (offsets to the reference with perturbation).
+    # The kernel backend calculates the double precision points, extended precision always uses numpy.
+    if frame_data.tier == ClassPrecisionTier.PERTURBATION:
+        return compute_iterations_perturbation(x, y, frame_data)
+
+    compute_iterations = compute_iterations_numpy
+    if frame_data.tier == ClassPrecisionTier.FLOAT64:
+        compute_iterations = get_kernel_backends()[worker_context.kernel_backend]
+
+    if frame_data.type_fractal == ClassTypeFractal.JULIA:
+        return compute_iterations(x, y,
+                                  convert_to_tier(frame_data.julia_a, frame_data.tier),
+                                  convert_to_tier(frame_data.julia_b, frame_data.tier),
+                                  frame_data.max_iterations, keep_state=keep_state)
+
+    # Points inside the main cardioid or the period 2 bulb are not iterated
+    iterations = np.zeros(x.shape, dtype=np.uint32)
+    outside = ~check_mandelbrot_interior(x, y)
+    result = compute_iterations(np.zeros(np.count_nonzero(outside), dtype=x.dtype),
+                                np.zeros(np.count_nonzero(outside), dtype=y.dtype),
+                                x[outside], y[outside],
+                                frame_data.max_iterations, keep_state=keep_state)
+    if not keep_state:
+        iterations[outside] = result
+        return iterations
+
+    state_x = np.full(x.shape, np.nan)
+    state_y = np.full(x.shape, np.nan)
+    iterations[outside], state_x[outside], state_y[outside] = result
+    return iterations, state_x, state_y
+
+def render_subdivision(frame_data, min_col, max_col, min_line, max_line):
+
+    # Mariani-Silver : a rectangle whose border has a single iteration count is filled without calculation,
+    # otherwise it is split in four. All the rectangles of a level are calculated together.
+    # Returns the iterations, the mask of the filled pixels and the number of calculated pixels.
+    iterations = np.zeros((max_line - min_line, max_col - min_col), dtype=np.uint32)
+    known = np.zeros(iterations.shape, dtype=bool)
+    filled = np.zeros(iterations.shape, dtype=bool)
+    nb_computed = 0
+
+    rectangles = [(0, iterations.shape[1], 0, iterations.shape[0])]
+    while len(rectangles) > 0:
+
+        # Select the pixels to calculate : borders of big rectangles and all of the small ones
+        needed = np.zeros(iterations.shape, dtype=bool)
+        big_rectangles = []
+        for (c0, c1, l0, l1) in rectangles:
+            if (c1 - c0) <= subdivision_min_size or (l1 - l0) <= subdivision_min_size:
+                needed[l0:l1, c0:c1] = True
+            else:
+                needed[l0, c0:c1] = needed[l1 - 1, c0:c1] = True
+                needed[l0:l1, c0] = needed[l0:l1, c1 - 1] = True
+                big_rectangles.append((c0, c1, l0, l1))
+
+        needed &= ~known
+        lines, cols = np.nonzero(needed)
+        iterations[lines, cols] = compute_pixels(frame_data, cols + min_col, lines + min_line)
+        known |= needed
+        nb_computed += lines.size
+
+        # Fill uniform rectangles, split the others (children share their middle lines)
+        rectangles = []
+        for (c0, c1, l0, l1) in big_rectangles:
+            border = np.concatenate((iterations[l0, c0:c1], iterations[l1 - 1, c0:c1],
+                                     iterations[l0:l1, c0], iterations[l0:l1, c1 - 1]))
+            if border.min() == border.max():
+                filled[l0 + 1:l1 - 1, c0 + 1:c1 - 1] |= ~known[l0 + 1:l1 - 1, c0 + 1:c1 - 1]
+                iterations[l0 + 1:l1 - 1, c0 + 1:c1 - 1] = border[0]
+                known[l0 + 1:l1 - 1, c0 + 1:c1 - 1] = True
+            else:
+                middle_col = (c0 + c1) // 2
+                middle_line = (l0 + l1) // 2
+                rectangles += [(c0, middle_col + 1, l0, middle_line + 1), (middle_col, c1, l0, middle_line + 1),
+                               (c0, middle_col + 1, middle_line, l1), (middle_col, c1, middle_line, l1)]
+
+    return iterations, filled, nb_computed
+
+def init_worker(project_parameters, inputs, progress_counters, progress_next_slot, frame_buffer, state_buffer,
+                frame_data_buffer, frame_data_size, cpu_limit, engine, kernel_backend, subdivision, nb_workers):
+    global parameters
+
+    # Ctrl-C is handled by the main process only, which stops the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    parameters = project_parameters
+    worker_context.inputs = inputs
+    worker_context.progress_counters = progress_counters
+    worker_context.frame_buffer = np.frombuffer(frame_buffer, dtype=np.uint32).reshape(-1, parameters.size_y,
+                                                                                        parameters.size_x)
+    if state_buffer is not None:
+        worker_context.state_buffer = np.frombuffer(state_buffer, dtype=np.float64).reshape(-1, 2, parameters.size_y,
+                                                                                            parameters.size_x)
+    worker_context.frame_data_buffer = np.frombuffer(frame_data_buffer, dtype=np.uint8).reshape(-1, frame_data_size)
+    with progress_next_slot.get_lock():
+        worker_context.progress_slot = progress_next_slot.value % len(progress_counters)
+        progress_next_slot.value += 1
+    worker_context.throttle = ClassThrottle(cpu_limit, (nb_workers + 1))      # the main process has its share too
+    worker_context.engine = engine
+    worker_context.kernel_backend = kernel_backend
+    worker_context.subdivision = subdivision
+
+def share_frame_data(frame_data, slot, frames_data):
+
+    # The data of a frame is written once in the shared buffer of its slot, the tasks only carry a handle to it.
+    # The slot must no longer be used by unfinished tasks, data too big for the buffer is carried by the tasks.
+    global frame_data_generation
+    frame_data_generation += 1
+
+    frame_handle = ClassFrameHandle()
+    frame_handle.slot = slot
+    frame_handle.generation = frame_data_generation
+    content = pickle.dumps(frame_data, protocol=pickle.HIGHEST_PROTOCOL)
+    if len(content) > frames_data.shape[1]:
+        frame_handle.frame_data = frame_data
+        return frame_handle
+
+    frames_data[slot, :len(content)] = np.frombuffer(content, dtype=np.uint8)
+    frame_handle.size = len(content)
+    return frame_handle
+
+def load_frame_data(frame_handle):
+
+    # Each worker reads the data of a frame once, the next tasks of the frame reuse it
+    if frame_handle.frame_data is not None:
+        return frame_handle.frame_data
+
+    generation, frame_data = worker_context.frames_data.get(frame_handle.slot, (0, None))
+    if generation != frame_handle.generation:
+        frame_data = pickle.loads(worker_context.frame_data_buffer[frame_handle.slot, :frame_handle.size].tobytes())
+        worker_context.frames_data[frame_handle.slot] = (frame_handle.generation, frame_data)
+    return frame_data
+
+def count_level_pixels(tile, level, coarser_level):
+
+    # Pixels of the tile on the grid of the level and not on the grid of the coarser level (0 for none)
+    def count_grid(first, last, grid_level):
+        return ((last + grid_level - 1) // grid_level) - ((first + grid_level - 1) // grid_level)
+
+    min_col, max_col, min_line, max_line = tile
+    nb_pixels = count_grid(min_col, max_col, level) * count_grid(min_line, max_line, level)
+    if coarser_level > 0:
+        nb_pixels -= count_grid(min_col, max_col, coarser_level) * count_grid(min_line, max_line, coarser_level)
+    return nb_pixels
+
+def select_level_pixels(frame_data, tile, level):
+
+    # Pixels of the tile to calculate to know the grid of the level : the pixels on the grid which are not
+    # mirrored, and the mirrors of the mirrored ones, wherever they are
+    min_col, max_col, min_line, max_line = tile
+    lines = np.arange(min_line, max_line)[:, np.newaxis]
+    cols = np.arange(min_col, max_col)[np.newaxis, :]
+    on_grid = ((lines % level) == 0) & ((cols % level) == 0)
+    if frame_data.mirrored is None:
+        return on_grid
+
+    mirror_lines = frame_data.mirror_lines[min_line:max_line][:, np.newaxis]
+    mirror_cols = frame_data.mirror_cols[min_col:max_col][np.newaxis, :]
+    mirror_on_grid = (mirror_lines >= 0) & (mirror_cols >= 0) & ((mirror_lines % level) == 0) & \
+                     ((mirror_cols % level) == 0)
+    return (on_grid | mirror_on_grid) & ~frame_data.mirrored[min_line:max_line, min_col:max_col]
+
+def upscale_level(iterations, level):
+
+    # Each calculated pixel of the level fills its block
+    if level == 1:
+        return iterations
+    return np.repeat(np.repeat(iterations[::level, ::level], level, axis=0), level, axis=1)[:iterations.shape[0],
+                                                                                              :iterations.shape[1]]
+
+def process_tile(tile, frame_handle, level=1, coarser_level=0):
+
+    # Writes the iterations of the tile in the shared frame buffer, only for the pixels first needed at this
+    # level. Returns the tile, the numbers of pixels calculated and filled without calculation, and the worker
+    # which calculated it with the start and end times of the calculation.
+    start_time_tile = time.perf_counter()
+    frame_data = load_frame_data(frame_handle)
+    min_col, max_col, min_line, max_line = tile
+    inputs = worker_context.inputs
+    throttle = worker_context.throttle
+
+    # Workers do not share the decimal context of the main process
+    getcontext().prec = frame_data.precision
+
+    if worker_context.engine == ClassEngine.REFERENCE:
+        tile_iterations = []
+        for line in range(min_line, max_line):
+            line_pixels, line_iterations = process_line(line, parameters=parameters, inputs=inputs, frame=frame_data.index,
+                                                        xmin=frame_data.xmin, xmax=frame_data.xmax,
+                                                        ymin=frame_data.ymin, ymax=frame_data.ymax,
+                                                        throttle=throttle)
+            tile_iterations.append(line_iterations)
+
+        tile_iterations = np.array(tile_iterations, dtype=np.uint32).reshape(-1, parameters.size_x)
+        worker_context.frame_buffer[frame_data.buffer_slot, min_line:max_line, :] = tile_iterations
+        return tile, tile_iterations.size, 0, os.getpid(), start_time_tile, time.perf_counter()
+
+    # Mirrored pixels are copied later, pixels of the coarser levels are already calculated
+    tile_iterations = worker_context.frame_buffer[frame_data.buffer_slot, min_line:max_line, min_col:max_col]
+    needed = select_level_pixels(frame_data, tile, level)
+    if coarser_level > 0:
+        needed &= ~select_level_pixels(frame_data, tile, coarser_level)
+
+    if worker_context.subdivision:
+        throttle.wait()
+
+        # Only the rectangle around the pixels which are not mirrored is subdivided
+        nb_computed, nb_filled = 0, 0
+        lines, cols = np.flatnonzero(needed.any(axis=1)), np.flatnonzero(needed.any(axis=0))
+        if lines.size > 0:
+            first_line, last_line = lines[0], lines[-1] + 1
+            first_col, last_col = cols[0], cols[-1] + 1
+            tile_iterations[first_line:last_line, first_col:last_col], filled, nb_computed = render_subdivision(
+                frame_data, min_col + first_col, min_col + last_col, min_line + first_line, min_line + last_line)
+            nb_filled = int(np.count_nonzero(filled & needed[first_line:last_line, first_col:last_col]))
+        update_progress(tile_iterations.size)
+
+        return tile, nb_computed, nb_filled, os.getpid(), start_time_tile, time.perf_counter()
+
+    # Decimal calculations are slow, progress is given line by line
+    lines_per_step = 1 if frame_data.tier == ClassPrecisionTier.ARBITRARY else (max_line - min_line)
+
+    # The z of the points still iterating are kept to continue them later (float64 only)
+    keep_state = (worker_context.state_buffer is not None) and (frame_data.tier == ClassPrecisionTier.FLOAT64)
+
+    for line in range(min_line, max_line, lines_per_step):
+
+        throttle.wait()
+
+        last_line = min(line + lines_per_step, max_line)
+        cols, lines = np.meshgrid(np.arange(min_col, max_col), np.arange(line, last_line))
+        step_needed = needed[line - min_line:last_line - min_line, :]
+        if step_needed.any():
+            step_iterations = compute_pixels(frame_data, cols[step_needed], lines[step_needed], keep_state)
+            if keep_state:
+                step_iterations, state_x, state_y = step_iterations
+                step_state = worker_context.state_buffer[frame_data.buffer_slot, :, line:last_line, min_col:max_col]
+                step_state[0][step_needed] = state_x
+                step_state[1][step_needed] = state_y
+            tile_iterations[line - min_line:last_line - min_line, :][step_needed] = step_iterations
+
+        update_progress(count_level_pixels((min_col, max_col, line, last_line), level, coarser_level))
+
+    return tile, int(np.count_nonzero(needed)), 0, os.getpid(), start_time_tile, time.perf_counter()
+
+def submit_frame(pool, frame_data, frames_data, iterations_frame, state_frame, tile_size, tile_order, full_lines,
+                 levels):
+
+    # Give the tiles of the frame to the pool, level by level, the results are collected later.
+    # The data of the frame is shared once, the tiles only carry their bounds.
+    pending_frame = ClassPendingFrame()
+    pending_frame.frame_data = frame_data
+    pending_frame.levels = levels
+
+    iterations_frame[:, :] = 0      # pixels of skipped tiles are mirrored later
+    if state_frame is not None:
+        state_frame[:, :, :] = np.nan
+
+    # Tiles of the coarse levels are bigger, so that each one still has enough pixels to calculate
+    frame_handle = share_frame_data(frame_data, frame_data.buffer_slot, frames_data)
+    coarser_level = 0
+    for level in levels:
+        level_tiles = split_tiles(frame_data, tile_size * level, tile_order, full_lines)
+        pending_frame.results.append([pool.apply_async(process_tile, (tile, frame_handle, level, coarser_level))
+                                      for tile in level_tiles])
+        pending_frame.nb_points += sum(count_level_pixels(tile, level, coarser_level) for tile in level_tiles)
+        pending_frame.tiles += level_tiles
+        coarser_level = level
+
+    return pending_frame
+
+def process_strip_band(band, strip):
+
+    # Iterations of the strip for the radii of the band, for all the angles
+    first, last = band
+    worker_context.throttle.wait()
+    getcontext().prec = strip.frame_data.precision
+
+    radii = np.exp(strip.log_radius_min + np.arange(first, last) * strip.step)
+    angles = np.arange(strip.nb_angles) * strip.step
+    delta_x = radii[:, np.newaxis] * np.cos(angles)[np.newaxis, :]
+    delta_y = radii[:, np.newaxis] * np.sin(angles)[np.newaxis, :]
+
+    if strip.frame_data.tier == ClassPrecisionTier.PERTURBATION:
+        iterations = compute_points(strip.frame_data, delta_x, delta_y)
+    else:
+        iterations = compute_points(strip.frame_data, float(strip.center_x) + delta_x, float(strip.center_y) + delta_y)
+    update_progress(iterations.size)
+
+    return band, iterations
+
+def process_inner_band(band, frame_handle):
+
+    # Iterations of the lines of the band of the deepest image of a strip
+    first, last = band
+    frame_data = load_frame_data(frame_handle)
+    worker_context.throttle.wait()
+    getcontext().prec = frame_data.precision
+
+    cols, lines = np.meshgrid(np.arange(parameters.size_x), np.arange(first, last))
+    iterations = compute_pixels(frame_data, cols, lines)
+    update_progress(iterations.size)
+
+    return band, iterations
+
+def render_strip(pool, strip, inputs, engine, frames_data, slot):
+
+    # The reference orbit of the strip is the center of the zoom, the deepest image has its own.
+    # Bands of radii and of lines are given to the first free core, the deepest image is shared in the slot.
+    with localcontext():
+        getcontext().prec = strip.frame_data.precision
+        if strip.frame_data.tier == ClassPrecisionTier.PERTURBATION:
+            strip.frame_data.reference = compute_reference_orbit(strip.center_x, strip.center_y, strip.frame_data)
+            compute_series_coefficients(strip.frame_data.reference, strip.frame_data)
+        precision = adjust_precision(*strip.inner_viewport, parameters.adaptive_decimal_precision)
+        inner_frame_data = prepare_frame(strip.inner_frame, inputs, *strip.inner_viewport, precision, engine,
+                                         strip.frame_data.max_iterations)
+
+    inner_frame_handle = share_frame_data(inner_frame_data, slot, frames_data)
+    strip_results = [pool.apply_async(process_strip_band, ((first, min(first + strip_band_size, strip.nb_radii)), strip))
+                     for first in range(0, strip.nb_radii, strip_band_size)]
+    inner_results = [pool.apply_async(process_inner_band, ((first, min(first + strip_band_size, parameters.size_y)),
+                                                           inner_frame_handle))
+                     for first in range(0, parameters.size_y, strip_band_size)]
+
+    strip_iterations = np.empty((strip.nb_radii, strip.nb_angles), dtype=np.uint32)
+    for result in strip_results:
+        (first, last), iterations = result.get()
+        strip_iterations[first:last, :] = iterations
+
+    inner_iterations = np.empty((parameters.size_y, parameters.size_x), dtype=np.uint32)
+    for result in inner_results:
+        (first, last), iterations = result.get()
+        inner_iterations[first:last, :] = iterations
+    strip.inner_frame_data = inner_frame_data       # only now, the strip is sent to the workers without it
+
+    return strip_iterations, inner_iterations
+
+def map_strip(strip, strip_iterations, inner_iterations, frame_data):
+
+    # Each pixel takes the nearest pixel of the deepest image when it is inside, otherwise the nearest sample
+    # of the strip, from the log of its distance to the center and its angle
+    with localcontext():
+        getcontext().prec = strip.frame_data.precision
+        offset_x = float(frame_data.xmin - strip.center_x)
+        offset_y = float(frame_data.ymax - strip.center_y)
+        width = float(frame_data.xmax - frame_data.xmin)
+        height = float(frame_data.ymax - frame_data.ymin)
+        inner_offset_x = float(strip.inner_frame_data.xmin - strip.center_x)
+        inner_offset_y = float(strip.inner_frame_data.ymax - strip.center_y)
+        inner_width = float(strip.inner_frame_data.xmax - strip.inner_frame_data.xmin)
+        inner_height = float(strip.inner_frame_data.ymax - strip.inner_frame_data.ymin)
+
+    delta_x = (offset_x + np.arange(parameters.size_x) * (width / parameters.size_x))[np.newaxis, :]
+    delta_y = (offset_y - np.arange(parameters.size_y) * (height / parameters.size_y))[:, np.newaxis]
+    radius = np.maximum(np.hypot(delta_x, delta_y), math.exp(strip.log_radius_min))
+    angle = np.arctan2(delta_y, delta_x)
+
+    radius_indexes = np.clip(np.rint((np.log(radius) - strip.log_radius_min) / strip.step), 0, strip.nb_radii - 1)
+    angle_indexes = np.rint(angle / strip.step).astype(np.int64) % strip.nb_angles
+
+    iterations = strip_iterations[radius_indexes.astype(np.int64), angle_indexes]
+
+    inner_cols = np.rint((delta_x - inner_offset_x) / (inner_width / parameters.size_x)).astype(np.int64)
+    inner_lines = np.rint((inner_offset_y - delta_y) / (inner_height / parameters.size_y)).astype(np.int64)
+    inside = (((inner_cols >= 0) & (inner_cols < parameters.size_x)) &
+              ((inner_lines >= 0) & (inner_lines < parameters.size_y)))
+    inner_lines, inner_cols = np.broadcast_arrays(inner_lines, inner_cols)
+    iterations[inside] = inner_iterations[inner_lines[inside], inner_cols[inside]]
+
+    return iterations
+
+def find_edge_pixels(iterations):
+
+    # Pixels whose iterations differ by more than antialiasing_max_gradient from one of their 8 neighbours
+    size_y, size_x = iterations.shape
+    padded = np.pad(iterations.astype(np.int64), 1, mode="edge")
+    gradient = np.zeros(iterations.shape, dtype=np.int64)
+    for line_shift in range(3):
+        for col_shift in range(3):
+            gradient = np.maximum(gradient, np.abs(padded[line_shift:line_shift + size_y, col_shift:col_shift + size_x]
+                                                   - padded[1:-1, 1:-1]))
+    return gradient > antialiasing_max_gradient
+
+def compute_subpixels(frame_data, lines, cols, factor):
+
+    # Iterations of factor x factor samples spread over each pixel, around its own sample.
+    # The offsets are symmetric, so a mirrored pixel has the same samples as its mirror.
+    offsets = (np.arange(factor) - ((factor - 1) / 2)) / factor
+    width = (frame_data.xmax - frame_data.xmin) / parameters.size_x
+    height = (frame_data.ymax - frame_data.ymin) / parameters.size_y
+
+    if frame_data.tier == ClassPrecisionTier.ARBITRARY:
+        samples = np.zeros((len(lines), factor * factor), dtype=np.uint32)
+        for index, (line, col) in enumerate(zip(lines, cols)):
+            for sample_line, offset_y in enumerate(offsets):
+                for sample_col, offset_x in enumerate(offsets):
+                    samples[index, (sample_line * factor) + sample_col] = compute_point_decimal(
+                        frame_data.x_axis[col] + Decimal(offset_x) * width,
+                        frame_data.y_axis[line] - Decimal(offset_y) * height, frame_data)
+        return samples
+
+    x = (frame_data.x_axis[cols][:, np.newaxis, np.newaxis]
+         + (offsets * convert_to_tier(width, frame_data.tier))[np.newaxis, np.newaxis, :])
+    y = (frame_data.y_axis[lines][:, np.newaxis, np.newaxis]
+         - (offsets * convert_to_tier(height, frame_data.tier))[np.newaxis, :, np.newaxis])
+    x, y = np.broadcast_arrays(x, y)
+    return compute_points(frame_data, x.ravel(), y.ravel()).reshape(len(lines), factor * factor)
+
+def process_antialiasing_chunk(chunk, frame_handle, factor):
+
+    # Samples of a group of refined pixels, given back to the main process
+    lines, cols = chunk
+    frame_data = load_frame_data(frame_handle)
+    worker_context.throttle.wait()
+    getcontext().prec = frame_data.precision
+
+    samples = compute_subpixels(frame_data, lines, cols, factor)
+    update_progress(samples.size)
+
+    return samples
+
+def supersample_edges(pool, progress, frame_data, frames_data, slot, edges, factor):
+
+    # Samples of the edge pixels, mirrored pixels take the ones of their mirror. The frame is shared in the slot.
+    # Returns the indexes of the edge pixels in the image and the iterations of their samples.
+    lines, cols = np.nonzero(edges)
+    source_lines, source_cols = lines, cols
+    if frame_data.mirrored is not None:
+        mirrored = frame_data.mirrored[lines, cols]
+        source_lines = np.where(mirrored, frame_data.mirror_lines[lines], lines)
+        source_cols = np.where(mirrored, frame_data.mirror_cols[cols], cols)
+    sources, source_indexes = np.unique((source_lines * parameters.size_x) + source_cols, return_inverse=True)
+    source_lines, source_cols = np.divmod(sources, parameters.size_x)
+    progress.add_points(sources.size * factor * factor)
+
+    frame_handle = share_frame_data(frame_data, slot, frames_data)
+    results = [pool.apply_async(process_antialiasing_chunk,
+                                ((source_lines[first:first + antialiasing_chunk_size],
+                                  source_cols[first:first + antialiasing_chunk_size]), frame_handle, factor))
+               for first in range(0, sources.size, antialiasing_chunk_size)]
+    samples = np.zeros((sources.size, factor * factor), dtype=np.uint32)
+    for first, result in zip(range(0, sources.size, antialiasing_chunk_size), results):
+        samples[first:first + antialiasing_chunk_size] = result.get()
+
+    return (lines * parameters.size_x) + cols, samples[source_indexes.ravel()]
+
+def check_independent_frames(inputs):
+
+    # Only centering needs the previous image to know the area of the next one
+    return all(not data.opt_centering for data in inputs)
+
+def split_tiles(frame_data, tile_size, tile_order, full_lines):
+
+    # Tiles are (min_col, max_col, min_line, max_line), whole lines for the reference engine.
+    # Tiles where every pixel is mirrored are not calculated at all.
+    tile_width = parameters.size_x if full_lines else tile_size
+    tiles = []
+    for min_line in range(0, parameters.size_y, tile_size):
+        for min_col in range(0, parameters.size_x, tile_width):
+            tile = (min_col, min(min_col + tile_width, parameters.size_x),
+                    min_line, min(min_line + tile_size, parameters.size_y))
+            if frame_data.mirrored is not None and frame_data.mirrored[tile[2]:tile[3], tile[0]:tile[1]].all():
+                continue
+            tiles.append(tile)
+
+    # The center of the image is often the most expensive part, starting with it leaves the small
+    # tiles of the edges to balance the end of the frame
+    if tile_order == ClassTileOrder.CENTER:
+        tiles.sort(key=lambda t: (((t[0] + t[1]) - parameters.size_x) ** 2 + ((t[2] + t[3]) - parameters.size_y) ** 2))
+
+    return tiles
+
+def init_continue_worker(project_parameters, inputs, cpu_limit, kernel_backend, nb_workers):
+    global parameters
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    parameters = project_parameters
+    worker_context.inputs = inputs
+    worker_context.throttle = ClassThrottle(cpu_limit, nb_workers)
+    worker_context.kernel_backend = kernel_backend
+
+def load_iterations(path_zip_iterations_file):
+
+    # Iterations of a saved frame, by line and column
+    with zipfile.ZipFile(path_zip_iterations_file, "r") as zip_file:
+        content = zip_file.read(os.path.basename(path_zip_iterations_file).replace(".zip", ""))
+    return np.frombuffer(content, dtype="<u2").reshape(parameters.size_x, parameters.size_y).T.astype(np.uint32)
+
+def continue_frame(frame):
+
+    # Iterate the points saved in the state file of the frame up to its new max_iterations,
+    # then rewrite its iterations, its image and its state. Returns the line to display.
+    frame_input = worker_context.inputs[frame]
+    path_iterations_file = f"{parameters.output_folder_path}/{parameters.output_iterations_prefix}{(frame+1):05d}"
+    header = f"{(frame + 1)}/{len(worker_context.inputs)};"
+
+    if not os.path.exists(f"{path_iterations_file}{state_file_suffix}"):
+        return f"{header}no state saved, skipped"
+
+    with np.load(f"{path_iterations_file}{state_file_suffix}") as state_file:
+        state = dict(state_file)
+    previous_max_iterations = int(state["max_iterations"])
+    if frame_input.max_iterations <= previous_max_iterations:
+        return f"{header}already calculated with max_iterations={previous_max_iterations}, skipped"
+
+    iterations = load_iterations(f"{path_iterations_file}.bin.zip")
+    indexes = state["indexes"].astype(np.int64)
+    lines, cols = np.divmod(indexes, parameters.size_x)
+    if state["mandelbrot"]:
+        cx, cy = state["x_axis"][cols], state["y_axis"][lines]
+    else:
+        cx, cy = np.full(indexes.size, state["julia"][0]), np.full(indexes.size, state["julia"][1])
+
+    # Points are continued by groups, to respect the CPU limitation
+    compute_iterations = get_kernel_backends()[worker_context.kernel_backend]
+    new_iterations = np.zeros(indexes.size, dtype=np.uint32)
+    state_x = np.full(indexes.size, np.nan)
+    state_y = np.full(indexes.size, np.nan)
+    for first in range(0, indexes.size, parameters.size_x):
+        worker_context.throttle.wait()
+        points = slice(first, first + parameters.size_x)
+        new_iterations[points], state_x[points], state_y[points] = compute_iterations(
+            state["zx"][points], state["zy"][points], cx[points], cy[points],
+            frame_input.max_iterations, start=(previous_max_iterations + 1), keep_state=True)
+    iterations.flat[indexes] = new_iterations
+
+    still_iterating = ~np.isnan(state_x)
+    state["max_iterations"] = np.int64(frame_input.max_iterations)
+    state["indexes"] = state["indexes"][still_iterating]
+    state["zx"], state["zy"] = state_x[still_iterating], state_y[still_iterating]
+
+    output_frame = ClassOutputFrame()
+    output_frame.index = frame
+    output_frame.iterations = iterations
+    output_frame.R, output_frame.G, output_frame.B = frame_input.R, frame_input.G, frame_input.B
+    output_frame.state = state
+    save_frame(output_frame)
+
+    return (f"{header}max_iterations=({previous_max_iterations},{frame_input.max_iterations});"
+            f"continued={indexes.size};escaped={np.count_nonzero(new_iterations)};"
+            f"still_iterating={np.count_nonzero(still_iterating)}")
+
+def save_durable(pathfile, write_function):
+
+    # The file is flushed to the disk before returning
+    with open(pathfile, "wb") as file:
+        write_function(file)
+        file.flush()
+        os.fsync(file.fileno())
+
+def save_frame(output_frame):
+
+    # Save zipped iterations file with numbering, streamed column by column without temporary file
+    path_bin_iterations_file = f"{parameters.output_folder_path}/{parameters.output_iterations_prefix}{(output_frame.index+1):05d}.bin"
+    if output_frame.iterations.max(initial=0) > iterations_max_value:
+        raise ValueError(f"Image {(output_frame.index + 1)} has iterations above {iterations_max_value}, "
+                         "they do not fit in the iterations file.")
+
+    def write_zip(file):
+        with zipfile.ZipFile(file, mode="w", compression=iterations_compressions[parameters.iterations_compression],
+                             compresslevel=parameters.iterations_compression_level) as zip_file:
+            with zip_file.open(os.path.basename(path_bin_iterations_file), mode="w",
+                               force_zip64=True) as iterations_file:      # size unknown until the end
+                for first_col in range(0, parameters.size_x, iterations_stream_columns):
+                    columns = output_frame.iterations[:, first_col:first_col + iterations_stream_columns]
+                    iterations_file.write(columns.T.astype("<u2").tobytes())
+    save_durable(f"{path_bin_iterations_file}.zip", write_zip)
+
+    # Save image with numbering, refined pixels take the average color of their samples
+    colors = colorize_iterations(output_frame.iterations, output_frame.R, output_frame.G, output_frame.B)
+    if output_frame.antialiasing is not None:
+        indexes, samples = output_frame.antialiasing
+        colors.reshape(-1, 3)[indexes] = np.rint(colorize_iterations(samples, output_frame.R, output_frame.G,
+                                                                     output_frame.B).mean(axis=1)).astype(np.uint8)
+    im = Image.fromarray(colors, "RGB")
+    save_durable(f"{parameters.output_folder_path}/{parameters.output_images_prefix}{(output_frame.index+1):05d}.png",
+                 lambda file: im.save(file, format="PNG"))
+
+    if output_frame.density_map is not None:
+        density_image = create_density_image(output_frame.density_map)
+        save_durable(f"{parameters.output_folder_path}/{parameters.density_images_prefix}{(output_frame.index+1):05d}.png",
+                     lambda file: density_image.save(file, format="PNG"))
+
+    # The state is written last : an interrupted frame is continued again from its previous state
+    path_state_file = f"{parameters.output_folder_path}/{parameters.output_iterations_prefix}{(output_frame.index+1):05d}{state_file_suffix}"
+    if output_frame.state is not None:
+        save_durable(path_state_file, lambda file: np.savez_compressed(file, **output_frame.state))
+    elif os.path.exists(path_state_file):
+        os.remove(path_state_file)      # left by a previous run, it no longer matches the iterations
+
+    # Files are on disk, the frame can be committed (not when continued, logs and resume are unchanged)
+    if output_frame.resume is not None:
+        logs.write_logs(output_frame.log_line, parameters.logs_pathfile)
+        output_frame.resume.save_to_xml()
+
+def save_preview(iterations, level, index, R, G, B, preview_name=None):
+
+    # Previews of each level are in their own folder, with the names of the images
+    if preview_name is None:
+        preview_name = f"preview_{level}"
+    preview_folder_path = f"{parameters.output_folder_path}/{preview_name}"
+    os.makedirs(preview_folder_path, exist_ok=True)
+    im = Image.fromarray(colorize_iterations(upscale_level(iterations, level), R, G, B), "RGB")
+    im.save(f"{preview_folder_path}/{parameters.output_images_prefix}{(index+1):05d}.png")
+
+def colorize_iterations(iterations, R, G, B):
+
+    # Same coloring as process_line : 0 iteration (inside the set) gives black
+    iterations = iterations.astype(np.int64)
+    colors = np.empty(iterations.shape + (3,), dtype=np.uint8)
+    colors[..., 0] = (R * iterations) % 256
+    colors[..., 1] = (G * iterations) % 256
+    colors[..., 2] = (B * iterations) % 256
+
+    return colors
 
 def validate_nb_cores_arg(value):
     try:
@@ -517,6 +2185,67 @@ def validate_cpu_arg(value):
     except ValueError:
         raise argparse.ArgumentTypeError("CPU limit must be between 1 and 100.")
 
+def validate_density_scale_arg(value):
+    try:
+        scale_value = int(value)
+        if scale_value <= 0:
+            raise argparse.ArgumentTypeError("Density scale must be equal to 1 or up.")
+        return scale_value
+    except ValueError:
+        raise argparse.ArgumentTypeError("Density scale must be equal to 1 or up.")
+
+def validate_tile_size_arg(value):
+    try:
+        tile_size_value = int(value)
+        if tile_size_value <= 0:
+            raise argparse.ArgumentTypeError("Tile size must be equal to 1 or up.")
+        return tile_size_value
+    except ValueError:
+        raise argparse.ArgumentTypeError("Tile size must be equal to 1 or up.")
+
+def validate_tile_order_arg(value):
+    tile_orders = {"raster": ClassTileOrder.RASTER, "center": ClassTileOrder.CENTER}
+    if value.lower() not in tile_orders:
+        raise argparse.ArgumentTypeError("Tile order must be 'raster' or 'center'.")
+    return tile_orders[value.lower()]
+
+def validate_frame_parallel_arg(value):
+    frame_parallel_modes = {"auto": ClassFrameParallel.AUTO, "on": ClassFrameParallel.ON, "off": ClassFrameParallel.OFF}
+    if value.lower() not in frame_parallel_modes:
+        raise argparse.ArgumentTypeError("Frame-parallel mode must be 'auto', 'on' or 'off'.")
+    return frame_parallel_modes[value.lower()]
+
+def validate_preview_level_arg(value):
+    try:
+        level_value = int(value)
+        if level_value not in progressive_levels:
+            raise argparse.ArgumentTypeError("Preview level must be 8, 4, 2 or 1.")
+        return level_value
+    except ValueError:
+        raise argparse.ArgumentTypeError("Preview level must be 8, 4, 2 or 1.")
+
+def validate_antialiasing_arg(value):
+    try:
+        factor_value = int(value)
+        if factor_value <= 0:
+            raise argparse.ArgumentTypeError("Anti-aliasing factor must be equal to 1 or up.")
+        return factor_value
+    except ValueError:
+        raise argparse.ArgumentTypeError("Anti-aliasing factor must be equal to 1 or up.")
+
+def validate_backend_arg(value):
+    kernel_backends = ["auto"] + list(get_kernel_backends())
+    if value.lower() not in kernel_backends:
+        raise argparse.ArgumentTypeError(f"Kernel backend must be {', '.join(repr(name) for name in kernel_backends)}.")
+    return value.lower()
+
+def validate_engine_arg(value):
+    engines = {"reference": ClassEngine.REFERENCE, "numpy": ClassEngine.NUMPY, "auto": ClassEngine.AUTO,
+               "perturbation": ClassEngine.PERTURBATION}
+    if value.lower() not in engines:
+        raise argparse.ArgumentTypeError("Engine must be 'auto', 'reference', 'numpy' or 'perturbation'.")
+    return engines[value.lower()]
+
 
 
 
@@ -541,6 +2270,13 @@ if __name__ == '__main__':
         help="Activate generation of density images.",
     )
 
+    parser.add_argument(
+        "--density-scale",
+        type=validate_density_scale_arg,
+        default=1,
+        help="Reduce the density images by this factor (1 or up), a block is red when one of its pixels is."
+    )
+
     parser.add_argument(
         "--cores",
         type=validate_nb_cores_arg,
@@ -555,10 +2291,102 @@ if __name__ == '__main__':
         help="CPU limitation in percent."
     )
 
+    parser.add_argument(
+        "--engine",
+        type=validate_engine_arg,
+        default=ClassEngine.AUTO,
+        help="Calculation engine ('auto', 'reference', 'numpy' or 'perturbation')."
+    )
+
+    parser.add_argument(
+        "--backend",
+        type=validate_backend_arg,
+        default=None,
+        help="Kernel backend of the double precision points, instead of the one of the project file "
+             f"('auto' or {', '.join(repr(name) for name in get_kernel_backends())})."
+    )
+
+    parser.add_argument(
+        "--check-backends",
+        action="store_true",
+        help="Check that every kernel backend gives the same results as the python one, measure their speed and exit."
+    )
+
+    parser.add_argument(
+        "--subdivision",
+        action="store_true",
+        help="Fill rectangles with a uniform border without calculating them.",
+    )
+
+    parser.add_argument(
+        "--tile-size",
+        type=validate_tile_size_arg,
+        default=64,
+        help="Size in pixels of the tiles given to the cores (1 or up)."
+    )
+
+    parser.add_argument(
+        "--tile-order",
+        type=validate_tile_order_arg,
+        default=ClassTileOrder.CENTER,
+        help="Order of calculation of the tiles ('center' or 'raster')."
+    )
+
+    parser.add_argument(
+        "--frame-parallel",
+        type=validate_frame_parallel_arg,
+        default=ClassFrameParallel.AUTO,
+        help="Calculate several independent images at once ('auto', 'on' or 'off')."
+    )
+
+    parser.add_argument(
+        "--state",
+        action="store_true",
+        help="Save the points still iterating, to raise max_iterations later with --continue."
+    )
+
+    parser.add_argument(
+        "--progressive",
+        action="store_true",
+        help="Calculate each image at 1/8, 1/4, 1/2 then full resolution, writing the previews of each level."
+    )
+
+    parser.add_argument(
+        "--preview-level",
+        type=validate_preview_level_arg,
+        default=1,
+        help="Stop each image at this level (8, 4, 2 or 1 for full resolution), only previews are written."
+    )
+
+    parser.add_argument(
+        "--exponential-map",
+        action="store_true",
+        help="Resample the images of a zoom toward a fixed center from a single log-polar strip, "
+             "only previews are written."
+    )
+
+    parser.add_argument(
+        "--antialiasing",
+        type=validate_antialiasing_arg,
+        default=1,
+        help="Supersample the pixels on the edges with factor x factor samples (1 for none), "
+             "the iterations files keep one sample per pixel."
+    )
+
+    parser.add_argument(
+        "--continue",
+        dest="continue_images",
+        action="store_true",
+        help="Continue the saved images up to the max_iterations of the inputs file."
+    )
+
     # Parse arguments
     args = parser.parse_args()
 
     # Treat the arguments
+    if args.check_backends:
+        sys.exit(check_kernel_backends())
+
     if args.project_filepath == None:
         project_pathfile = input("\nNo project pathfile provided.\n"
                                  "--h or --help to get help.\n"
@@ -587,11 +2415,72 @@ if __name__ == '__main__':
         parameters.load_from_xml(args.project_filepath)
         print(f"Description: {parameters.description}")
 
+        kernel_backend = select_kernel_backend(args.backend if args.backend is not None else parameters.kernel_backend)
+        parameters.iterations_compression, parameters.iterations_compression_level = select_iterations_compression(
+            parameters.iterations_compression, parameters.iterations_compression_level)
+        print(f"Kernel backend: {kernel_backend}")
+
         if args.density:
             debug = ClassDebug.IMAGES_DENSITY
         else:
             debug = ClassDebug.NONE
 
+        if args.subdivision and args.engine == ClassEngine.REFERENCE:
+            print("The reference engine calculates every pixel, subdivision is ignored.")
+            args.subdivision = False
+
+        if args.subdivision and args.state:
+            print("Filled pixels have no state to continue, subdivision is ignored.")
+            args.subdivision = False
+
+        if (args.progressive or args.preview_level > 1) and args.engine == ClassEngine.REFERENCE:
+            print("The reference engine calculates whole lines, progressive calculation and previews are ignored.")
+            args.progressive = False
+            args.preview_level = 1
+
+        if args.subdivision and (args.progressive or args.preview_level > 1):
+            print("Levels have their own pixels to calculate, subdivision is ignored.")
+            args.subdivision = False
+
+        if args.exponential_map and (args.engine == ClassEngine.REFERENCE or args.state or args.preview_level > 1):
+            print("The exponential map needs the numpy engines, full images and no state, it is ignored.")
+            args.exponential_map = False
+
+        if args.antialiasing > 1 and (args.engine == ClassEngine.REFERENCE or args.preview_level > 1 or
+                                      args.exponential_map):
+            print("The reference engine and the previews have one sample per pixel, anti-aliasing is ignored.")
+            args.antialiasing = 1
+
+        # Levels calculated for each image, the pixels of a level are reused by the next ones
+        if args.progressive:
+            levels = tuple(level for level in progressive_levels if level >= args.preview_level)
+        else:
+            levels = (args.preview_level,)
+
+    # Continue saved images instead of calculating them
+    if args.continue_images:
+        inputs = ReadInputsFile(parameters.inputs_pathfile)
+        if len(inputs) == 0:
+            print("Error with Inputs file")
+            sys.exit(1)
+        if not check_max_iterations(inputs):
+            sys.exit(1)
+
+        pool = Pool(processes=args.cores, initializer=init_continue_worker,
+                    initargs=(parameters, inputs, args.cpu, kernel_backend, args.cores))
+        try:
+            for continue_line in pool.imap(continue_frame, range(len(inputs))):
+                print(continue_line)
+        except KeyboardInterrupt:
+            pool.terminate()
+            pool.join()
+            print("\nInterrupted, run the script again to continue the remaining images.")
+            sys.exit(1)
+
+        pool.close()
+        pool.join()
+        sys.exit(0)
+
     # ask for resume if needed
     resume.resume_pathfile = parameters.resume_pathfile
     use_resume = 0
@@ -627,6 +2516,8 @@ if __name__ == '__main__':
     if len(inputs) == 0:
         print("Error with Inputs file")
         sys.exit(1)
+    if not check_max_iterations(inputs):
+        sys.exit(1)
 
     if use_resume == 1:
         resume.load_from_xml()
@@ -656,184 +2547,349 @@ if __name__ == '__main__':
     # Initialize EMA
     EMA_duration_per_image = ClassEMA(0.80)
 
-    for frame in range(start_frame, len(inputs)):
+    # Independent images can be calculated several at once, each one in its own buffer
+    frame_window = 1
+    full_lines = (args.engine == ClassEngine.REFERENCE)
+    if args.frame_parallel != ClassFrameParallel.OFF:
+        if not check_independent_frames(inputs):
+            if args.frame_parallel == ClassFrameParallel.ON:
+                print("Images depend on each other (centering), frame-parallel mode is disabled.")
+        else:
+            nb_tiles = math.ceil(parameters.size_y / args.tile_size)
+            if not full_lines:
+                nb_tiles *= math.ceil(parameters.size_x / args.tile_size)
+            if (args.frame_parallel == ClassFrameParallel.ON) or \
+                    ((args.cores > 1) and (nb_tiles < (frame_parallel_min_tiles_per_core * args.cores))):
+                frame_window = args.cores + 1
+    frame_window = max(1, min(frame_window, len(inputs) - start_frame))
+
+    # Without centering, areas are known in advance : images only differing by max_iterations are calculated once
+    sweep_leaders = {frame: frame for frame in range(start_frame, len(inputs))}
+    sweep_max_iterations = {frame: inputs[frame].max_iterations for frame in range(start_frame, len(inputs))}
+    if check_independent_frames(inputs):
+        viewports = plan_viewports(inputs, start_frame, xmin, xmax, ymin, ymax, parameters.adaptive_decimal_precision)
+        if (args.engine != ClassEngine.REFERENCE) and not args.state:      # derived images have no state
+            sweep_leaders, sweep_max_iterations = group_sweeps(inputs, viewports, start_frame)
+    sweep_iterations = None
+    sweep_frame_data = None
+
+    # Images of a zoom toward a fixed center can be resampled from a single strip
+    exponential_leaders = {}
+    exponential_strips = {}
+    if args.exponential_map:
+        if not check_independent_frames(inputs):
+            print("Images depend on each other (centering), the exponential map is ignored.")
+            args.exponential_map = False
+        else:
+            exponential_leaders, exponential_strips = group_exponential_maps(inputs, viewports, start_frame, args.engine)
+            for frame in range(start_frame, len(inputs)):
+                if (frame in exponential_leaders) or (sweep_leaders[frame] in exponential_leaders):
+                    sweep_leaders[frame] = frame
+                    sweep_max_iterations[frame] = inputs[frame].max_iterations
+    strip = None
+    strip_iterations = None
+    inner_iterations = None
+
+    # Start the workers once for the whole run, with the static data of the project
+    progress = ClassProgressReporter(args.cores, progress_interval)
+    progress.nb_images = len(inputs)
+    progress.start()
+
+    # Workers write the iterations of their tiles directly in these buffers, one per image of the window
+    frame_buffer = RawArray(ctypes.c_uint32, (frame_window * parameters.size_x * parameters.size_y))
+    frames_iterations = np.frombuffer(frame_buffer, dtype=np.uint32).reshape(frame_window, parameters.size_y,
+                                                                              parameters.size_x)
+
+    # And the z of their points still iterating, to continue them later
+    state_buffer = None
+    frames_state = None
+    if args.state:
+        state_buffer = RawArray(ctypes.c_double, (frame_window * 2 * parameters.size_x * parameters.size_y))
+        frames_state = np.frombuffer(state_buffer, dtype=np.float64).reshape(frame_window, 2, parameters.size_y,
+                                                                             parameters.size_x)
+
+    # And the data of their frames, written once and read by each worker instead of being sent with every tile
+    frame_data_size = ((2 * parameters.size_x * parameters.size_y) +
+                       (64 * max(data.max_iterations for data in inputs)) + frame_data_margin)
+    frame_data_buffer = RawArray(ctypes.c_uint8, (frame_window * frame_data_size))
+    frames_data = np.frombuffer(frame_data_buffer, dtype=np.uint8).reshape(frame_window, frame_data_size)
+
+    writer = ClassFrameWriter(writer_queue_size)
+    throttle = ClassThrottle(args.cpu, (args.cores + 1))
+
+    pool = Pool(processes=args.cores, initializer=init_worker,
+                initargs=(parameters, inputs, progress.counters, progress.next_slot, frame_buffer, state_buffer,
+                          frame_data_buffer, frame_data_size, args.cpu, args.engine, kernel_backend, args.subdivision,
+                          args.cores))
+    workers_pids = set()      # workers seen since the start, to also report the idle ones
+
+    # Every exit goes through the same cleanup, the pool is stopped at once when the run is not finished
+    exit_code = 0
+    finished = False
+    interrupted = False
+    try:
+        pending_frames = {}
+        next_frame = start_frame
+        progress.start_frame(start_frame, 0)
+
+        for frame in range(start_frame, len(inputs)):
+
+            # The main process (symmetry, centering, sweeps and the frames saved by the writer thread) keeps to
+            # its share of the CPU limit
+            throttle.wait()
+
+            # Calcul start image for this frame
+            start_time_frame = time.time()
+
+            # Start this image, and the next ones of the window in frame-parallel mode
+            while next_frame < min(frame + frame_window, len(inputs)):
+
+                # Next images of a max_iterations sweep are derived from the first one, zoom images from their strip
+                if (sweep_leaders[next_frame] != next_frame) or (next_frame in exponential_leaders):
+                    pending_frames[next_frame] = None
+                    next_frame += 1
+                    continue
+
+                if frame_window > 1:
+                    xmin, xmax, ymin, ymax = viewports[next_frame]
+
+                # Adapt decimal precision
+                precision = adjust_precision(xmin, xmax, ymin, ymax, parameters.adaptive_decimal_precision)
+
+                # Choose numeric tier and compute coordinates axes for this frame
+                frame_data = prepare_frame(next_frame, inputs, xmin, xmax, ymin, ymax, precision, args.engine,
+                                           sweep_max_iterations[next_frame])
+                frame_data.buffer_slot = next_frame % frame_window
+
+                # Small tiles are given to the first free core
+                state_frame = None if frames_state is None else frames_state[frame_data.buffer_slot]
+                pending_frames[next_frame] = submit_frame(pool, frame_data, frames_data,
+                                                          frames_iterations[frame_data.buffer_slot], state_frame,
+                                                          args.tile_size, args.tile_order, full_lines, levels)
+                if frame_window == 1:
+                    progress.start_frame(next_frame, 0)
+                progress.add_points(pending_frames[next_frame].nb_points)
+                next_frame += 1
+
+            pending_frame = pending_frames.pop(frame)
+            if pending_frame is not None:
+                frame_data = pending_frame.frame_data
+                tiles = pending_frame.tiles
+            elif frame in exponential_leaders:
+                frame_data = prepare_mapped_frame(frame, inputs, viewports[frame],
+                                                  exponential_strips[exponential_leaders[frame]])
+            else:
+                frame_data = sweep_frame_data
+            iterations_frame = frames_iterations[frame % frame_window]
+            xmin, xmax, ymin, ymax = frame_data.xmin, frame_data.xmax, frame_data.ymin, frame_data.ymax
+            getcontext().prec = frame_data.precision
+            progress.set_image(frame)
+
+            # Fill logs class
+            logs.current_precision = frame_data.precision
+            logs.current_tier = frame_data.tier
+            logs.current_xmin = xmin
+            logs.current_xmax = xmax
+            logs.current_ymin = ymin
+            logs.current_ymax = ymax
+
+            # Make image
+            nb_points = (parameters.size_y * parameters.size_x)
+
+            if pending_frame is not None:
+                nb_computed, nb_filled = 0, 0
+                busy_time_workers = {}
+                first_start_time, last_end_time = math.inf, -math.inf
+                for level, level_results in zip(pending_frame.levels, pending_frame.results):
+                    for result in level_results:
+                        tile, tile_computed, tile_filled, worker_pid, start_time_tile, end_time_tile = result.get()
+                        nb_computed += tile_computed
+                        nb_filled += tile_filled
+                        busy_time_workers[worker_pid] = (busy_time_workers.get(worker_pid, 0.0) +
+                                                         (end_time_tile - start_time_tile))
+                        first_start_time = min(first_start_time, start_time_tile)
+                        last_end_time = max(last_end_time, end_time_tile)
+
+                    # Previews of the intermediate levels are written while the next level is calculated
+                    if level != pending_frame.levels[-1]:
+                        apply_symmetry(iterations_frame, frame_data)
+                        save_preview(derive_sweep_iterations(iterations_frame, inputs[frame].max_iterations), level,
+                                     frame, inputs[frame].R, inputs[frame].G, inputs[frame].B)
+
+                # From the first tile started to the last one finished, the time waiting in the queue of the pool
+                # (behind the tiles of other images) is not counted
+                duration_tiles = max(last_end_time - first_start_time, 1e-9)
+                workers_pids.update(busy_time_workers.keys())
+                apply_symmetry(iterations_frame, frame_data)
+                if frames_state is not None:
+                    apply_symmetry_state(frames_state[frame % frame_window], frame_data)
+                progress.display()
+
+                # Images stopped at a preview level are used as they look, for the centering and the sweeps
+                if pending_frame.levels[-1] > 1:
+                    iterations_frame[:, :] = upscale_level(iterations_frame, pending_frame.levels[-1])
+
+                if sweep_leaders.get(frame + 1) == frame:
+                    sweep_iterations = iterations_frame.copy()
+                    sweep_frame_data = frame_data
+
+            # The strip is calculated with the first image of its group, with the highest max_iterations
+            if frame in exponential_leaders:
+                if strip is not exponential_strips[exponential_leaders[frame]]:
+                    strip = exponential_strips[exponential_leaders[frame]]
+                    if frame_window == 1:
+                        progress.start_frame(frame, 0)
+                    progress.add_points((strip.nb_radii * strip.nb_angles) + nb_points)
+                    strip_iterations, inner_iterations = render_strip(pool, strip, inputs, args.engine, frames_data,
+                                                                      frame % frame_window)
+                    progress.display()
+                iterations_frame[:, :] = derive_sweep_iterations(map_strip(strip, strip_iterations, inner_iterations,
+                                                                           frame_data),
+                                                                 inputs[frame].max_iterations)
+
+            # Images of a max_iterations sweep keep the points escaping within their own max_iterations
+            elif (pending_frame is None) or (sweep_max_iterations[frame] != inputs[frame].max_iterations):
+                iterations_frame[:, :] = derive_sweep_iterations(sweep_iterations, inputs[frame].max_iterations)
+
+            # Pixels on the edges are supersampled, the iterations keep their own sample
+            antialiasing = None
+            if args.antialiasing > 1:
+                antialiasing_frame_data = frame_data
+                if frame_data.x_axis is None:       # resampled images have no axes
+                    antialiasing_frame_data = prepare_frame(frame, inputs, xmin, xmax, ymin, ymax, frame_data.precision,
+                                                            args.engine, sweep_max_iterations[frame])
+                edges = find_edge_pixels(iterations_frame)
+                indexes, samples = supersample_edges(pool, progress, antialiasing_frame_data, frames_data,
+                                                     frame % frame_window, edges, args.antialiasing)
+                antialiasing = (indexes, derive_sweep_iterations(samples, inputs[frame].max_iterations))
+                progress.display()
+
+            print("", end="\r")
+
+            density_map = None
+
+            # Manage centering option
+            if (inputs[frame].opt_centering) or (debug == ClassDebug.IMAGES_DENSITY):
+
+                # Calculate the threshold of interest from the average and the standard deviation
+                threshold_standard_deviation = compute_density_threshold(iterations_frame, inputs[frame].centering_sigma)
+
+                # Calculate interesting map, keep it for the density image
+                interesting = check_density(iterations_frame, threshold_standard_deviation)
+                if debug == ClassDebug.IMAGES_DENSITY:
+                    density_map = reduce_density(interesting, args.density_scale)
+
+                # Calculate the new center
+                if inputs[frame].opt_centering:
+                    most_interesting_point = find_most_interesting_point(interesting.T, parameters.size_x, parameters.size_y,
+                                                                         center_x, center_y,
+                                                                         inputs[frame].centering_up,
+                                                                         inputs[frame].centering_down,
+                                                                         inputs[frame].centering_left,
+                                                                         inputs[frame].centering_right)
+                    if most_interesting_point == None:
+                        print("Terminated prematurely (nothing left to display)")
+                        exit_code = 1
+                        break
+
+                    interesting_x, interesting_y = most_interesting_point
+                    fractal_x = (xmin + (interesting_x * ((xmax - xmin) / parameters.size_x)))
+                    fractal_y = (ymax - (interesting_y * ((ymax - ymin) / parameters.size_y)))
+                    width = xmax - xmin
+                    height = ymax - ymin
+                    xmin, xmax = (fractal_x - (width / 2)), (fractal_x + (width / 2))
+                    ymin, ymax = (fractal_y - (height / 2)), (fractal_y + (height / 2))
+
+                    logs.nearest_interesting_x, logs.nearest_interesting_y = most_interesting_point
+
+            # Treat case without centering
+            if not inputs[frame].opt_centering:
+                logs.nearest_interesting_x = center_x
+                logs.nearest_interesting_y = center_y
+
+            # Manage move and zoom options
+            xmin, xmax, ymin, ymax = next_viewport(inputs, frame, xmin, xmax, ymin, ymax)
+
+            # Get elapsed time for logs and resume
+            elapsed_time = (time.time() - start_time)
+
+            # Get remaining time for logs
+            duration_per_frame = EMA_duration_per_image.add_value(time.time() - start_time_frame)
+            remaining_time = (duration_per_frame * (len(inputs) - (frame + 1)))
+
+            # Print logs, they are written with the files of the frame
+            logs.cnt_images = (frame + 1)
+            log_line = logs.return_output_line(elapsed_time + resume_time, remaining_time)
+            print(log_line)
+
+            if frame in exponential_leaders:
+                print(f"exponential map: resampled from the strip of images {(strip.frames[0] + 1)} to "
+                      f"{(strip.frames[-1] + 1)} (radii={strip.nb_radii};angles={strip.nb_angles})")
+            elif pending_frame is None:
+                print(f"max_iterations sweep: derived from image {sweep_leaders[frame] + 1}")
+            else:
+                workers_utilization = [f"{(busy_time_workers.get(worker_pid, 0.0) * 100 / duration_tiles):.0f}%"
+                                       for worker_pid in sorted(workers_pids)]
+                print(f"tiles={len(tiles)};workers_utilization=({','.join(workers_utilization)})")
+
+            if args.subdivision and (pending_frame is not None):
+                nb_mirrored = 0 if frame_data.mirrored is None else int(np.count_nonzero(frame_data.mirrored))
+                print(f"subdivision: computed={nb_computed};filled={nb_filled};"
+                      f"mirrored={nb_mirrored};filled_percent={(nb_filled * 100 / nb_points):.2f}%")
+
+            if antialiasing is not None:
+                print(f"antialiasing: refined={antialiasing[0].size};samples={args.antialiasing * args.antialiasing};"
+                      f"refined_percent={(antialiasing[0].size * 100 / nb_points):.2f}%")
+
+            # Give the frame to the writer, with the resume file to commit once it is saved
+            frame_resume = ClassResume()
+            frame_resume.resume_pathfile = resume.resume_pathfile
+            frame_resume.cnt_images = (frame + 1)
+            frame_resume.xmin = xmin
+            frame_resume.xmax = xmax
+            frame_resume.ymin = ymin
+            frame_resume.ymax = ymax
+            frame_resume.elapsed_time = (elapsed_time + resume_time)
+
+            output_frame = ClassOutputFrame()
+            output_frame.index = frame
+            output_frame.iterations = iterations_frame.copy()      # the shared buffer is reused by the next frame
+            output_frame.R, output_frame.G, output_frame.B = inputs[frame].R, inputs[frame].G, inputs[frame].B
+            output_frame.density_map = density_map
+            output_frame.antialiasing = antialiasing
+            if (frames_state is not None) and (frame_data.tier == ClassPrecisionTier.FLOAT64):
+                output_frame.state = extract_state(frames_state[frame % frame_window], frame_data)
+            output_frame.log_line = log_line
+            output_frame.resume = frame_resume
+
+            # Preview runs only write the previews, the images are calculated by a later run
+            if args.exponential_map:
+                save_preview(iterations_frame, 1, frame, inputs[frame].R, inputs[frame].G, inputs[frame].B,
+                             "preview_exponential")
+            elif args.preview_level == 1:
+                writer.put(output_frame)
+            else:
+                save_preview(iterations_frame, args.preview_level, frame, inputs[frame].R, inputs[frame].G,
+                             inputs[frame].B)
+
+        finished = True
+
+    except KeyboardInterrupt:
+        interrupted = True
+        exit_code = 1
+
+    finally:
+        if finished:
+            pool.close()
+        else:
+            pool.terminate()
+        pool.join()
+        progress.stop()
+        writer.close()      # finished frames are still saved
 
-        # Calcul start image for this frame
-        start_time_frame = time.time()
-
-        # Adapt decimal precision
-        logs.current_precision = adjust_precision(xmin, xmax, ymin, ymax, parameters.adaptive_decimal_precision)
-
-        # Initialize image
-        im = Image.new("RGB", (parameters.size_x, parameters.size_y), (255, 255, 255))
-        pixels = im.load()
-
-        # Fill logs class
-        logs.current_xmin = xmin
-        logs.current_xmax = xmax
-        logs.current_ymin = ymin
-        logs.current_ymax = ymax
-
-        # Make image
-        iterations_grid = [[0] * parameters.size_y for _ in range(parameters.size_x)]
-        nb_points = (parameters.size_y * parameters.size_x)
-        cnt_points = 0
-        string_percent_points = ""
-
-        lines_per_core = math.ceil(parameters.size_y / args.cores)
-
-        manager_for_cores_percent = Manager()
-        cores_percent_manager = manager_for_cores_percent.dict({
-            "cnt_points": 0,
-            "nb_points": (parameters.size_x * parameters.size_y),
-            "nb_points_per_update": parameters.size_x,
-            "string_percent_points": "",
-            "cnt_images": frame,
-            "nb_images": len(inputs),
-        })
-
-        func = partial(process_block, parameters=parameters, inputs=inputs, frame=frame,
-                       xmin=xmin, xmax=xmax, ymin=ymin, ymax=ymax, cores_percent_manager=cores_percent_manager, cpu_limit=args.cpu)
-
-        blocks = [(i * lines_per_core, min((i + 1) * lines_per_core, parameters.size_y))
-                  for i in range(args.cores)]
-
-        with Pool(processes=args.cores) as pool:
-            results = pool.map(func, blocks)
-
-        for block_index, (block_pixels, block_iterations) in enumerate(results):
-            min_line = block_index * lines_per_core
-            for line_offset, (line_pixels, line_iterations) in enumerate(zip(block_pixels, block_iterations)):
-                actual_line = min_line + line_offset
-                for col, color in enumerate(line_pixels):
-                    pixels[col, actual_line] = color
-                for col, iteration in enumerate(line_iterations):
-                    iterations_grid[col][actual_line] = iteration
-
-        print("", end="\r")
-
-        # Manage centering option
-        if (inputs[frame].opt_centering) or (debug == ClassDebug.IMAGES_DENSITY):
-
-            # Calculate iterations average
-            nb_pixels = (parameters.size_y * parameters.size_x)
-            sum_iterations = 0
-            for line in range(parameters.size_y):
-                for col in range(parameters.size_x):
-                    sum_iterations += iterations_grid[col][line]
-            iterations_average = sum_iterations / nb_pixels
-
-            # Calculate variance
-            sum_deviation_squared = 0
-            for line in range(parameters.size_y):
-                for col in range(parameters.size_x):
-                    sum_deviation_squared += (iterations_grid[col][line] - iterations_average) ** 2
-            variance = sum_deviation_squared / nb_pixels
-
-            # Calculate standard deviation
-            standard_deviation = math.sqrt(variance)
-            threshold_standard_deviation = (iterations_average + (inputs[frame].centering_sigma * standard_deviation))
-
-            # Calculate interesting map, generate density image for debug
-            density_map, flags_density = check_density(iterations_grid, parameters.size_x, parameters.size_y, threshold_standard_deviation)
-            if debug == ClassDebug.IMAGES_DENSITY:
-                density_map.save(f"{parameters.output_folder_path}/{parameters.density_images_prefix}{(frame+1):05d}.png")
-
-            # Calculate the new center
-            if inputs[frame].opt_centering:
-                most_interesting_point = find_most_interesting_point(flags_density, parameters.size_x, parameters.size_y,
-                                                                     center_x, center_y,
-                                                                     inputs[frame].centering_up,
-                                                                     inputs[frame].centering_down,
-                                                                     inputs[frame].centering_left,
-                                                                     inputs[frame].centering_right)
-                if most_interesting_point == None:
-                    print("Terminated prematurely (nothing left to display)")
-                    sys.exit(1)
-
-                interesting_x, interesting_y = most_interesting_point
-                fractal_x = (xmin + (interesting_x * ((xmax - xmin) / parameters.size_x)))
-                fractal_y = (ymax - (interesting_y * ((ymax - ymin) / parameters.size_y)))
-                width = xmax - xmin
-                height = ymax - ymin
-                xmin, xmax = (fractal_x - (width / 2)), (fractal_x + (width / 2))
-                ymin, ymax = (fractal_y - (height / 2)), (fractal_y + (height / 2))
-
-                logs.nearest_interesting_x, logs.nearest_interesting_y = most_interesting_point
-
-        # Treat case without centering
-        if not inputs[frame].opt_centering:
-            logs.nearest_interesting_x = center_x
-            logs.nearest_interesting_y = center_y
-
-        # Manage move option
-        if inputs[frame].opt_move:
-
-            # Calculate next move
-            xmin += inputs[frame].move_x
-            xmax += inputs[frame].move_x
-            ymin += inputs[frame].move_y
-            ymax += inputs[frame].move_y
-
-        # Manage zoom option
-        if inputs[frame].opt_zoom:
-
-            # Calculate next zoom
-            width = xmax - xmin
-            height = ymax - ymin
-            inverse_zoom = Decimal(1.0 - inputs[frame].zoom_amount)
-            xmin += ((width * inverse_zoom) / 2)
-            xmax -= ((width * inverse_zoom) / 2)
-            ymin += ((height * inverse_zoom) / 2)
-            ymax -= ((height * inverse_zoom) / 2)
-
-        # Manage case without zoom, neither centering, neither move
-        if not inputs[frame].opt_zoom and not inputs[frame].opt_centering and not inputs[frame].opt_move:
-            if frame < (len(inputs) - 1):
-                xmin = Decimal(inputs[frame + 1].xmin)
-                xmax = Decimal(inputs[frame + 1].xmax)
-                ymin = Decimal(inputs[frame + 1].ymin)
-                ymax = Decimal(inputs[frame + 1].ymax)
-
-        # Save zipped iterations file with numbering
-        path_bin_iterations_file = f"{parameters.output_folder_path}/{parameters.output_iterations_prefix}{(frame+1):05d}.bin"
-        with open(path_bin_iterations_file, "wb") as iterations_file:
-            for col in range(parameters.size_x):
-                for line in range(parameters.size_y):
-                    iterations_file.write(struct.pack("<H", iterations_grid[col][line]))
-
-        with zipfile.ZipFile(f"{path_bin_iterations_file}.zip",
-                             mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zip_file:
-            zip_file.write(path_bin_iterations_file, arcname=os.path.basename(path_bin_iterations_file))
-
-        os.remove(path_bin_iterations_file)
-
-        # Save image with numbering
-        im.save(f"{parameters.output_folder_path}/{parameters.output_images_prefix}{(frame+1):05d}.png")
-        #im.show()
-
-        # Get elapsed time for logs and resume
-        elapsed_time = (time.time() - start_time)
-
-        # Get remaining time for logs
-        duration_per_frame = EMA_duration_per_image.add_value(time.time() - start_time_frame)
-        remaining_time = (duration_per_frame * (len(inputs) - (frame + 1)))
-
-        # Print and write logs
-        logs.cnt_images = (frame + 1)
-        log_line = logs.return_output_line(elapsed_time + resume_time, remaining_time)
-        print(log_line)
-        logs.write_logs(log_line, parameters.logs_pathfile)
-
-        # Write resume file
-        resume.cnt_images = (frame + 1)
-        resume.xmin = xmin
-        resume.xmax = xmax
-        resume.ymin = ymin
-        resume.ymax = ymax
-        resume.elapsed_time = (elapsed_time + resume_time)
-        resume.save_to_xml()
+    if interrupted:
+        print("\nInterrupted, run the script again and choose to resume after the last finalized image.")
 
     # End
-    sys.exit(0)
+    sys.exit(exit_code)
 
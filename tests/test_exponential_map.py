@@ -0,0 +1,90 @@
+# Fractal Toolbox is a series of python scripts for generating images
+# and videos based on Julia and Mandelbrot sets.
+# Copyright (C) 2024  Vivien ELIE
+#
+# This file is part of Fractal Toolbox.
+#
+# Fractal Toolbox is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+#
+# Fractal Toolbox is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with Fractal Toolbox.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import subprocess
+import sys
+import numpy as np
+from PIL import Image
+
+script_pathfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "make_images.py")
+nb_frames = 40
+
+
+def make_project(folder, name):
+
+    # Zoom of nb_frames images toward a fixed center, 96x64 pixels
+    inputs_pathfile = os.path.join(folder, f"{name}.csv")
+    with open(inputs_pathfile, "w", encoding="utf-8") as file:
+        file.write("type_fractal;max_iterations;julia_a;julia_b;xmin;xmax;ymin;ymax;r;g;b;opt_next_image;"
+                   "zoom_amount;centering_sigma;centering_up;centering_down;centering_left;centering_right;"
+                   "move_x;move_y\n")
+        for frame in range(nb_frames):
+            file.write("mandelbrot;300;;;-0.895;-0.595;0.0;0.2;40;45;5;zoom;0.95;2.0;0;0;0;0;0.0;0.0\n")
+
+    output_folder = os.path.join(folder, name)
+    project_pathfile = os.path.join(folder, f"{name}.xml")
+    with open(project_pathfile, "w", encoding="utf-8") as file:
+        file.write(f"""<?xml version="1.0" encoding="utf-8"?>
+<Project_images>
+ <description>{name}</description>
+ <inputs_pathfile>{inputs_pathfile}</inputs_pathfile>
+ <size_x>96</size_x>
+ <size_y>64</size_y>
+ <adaptive_decimal_precision>6</adaptive_decimal_precision>
+ <output_folder_path>{output_folder}</output_folder_path>
+ <output_images_prefix>img_</output_images_prefix>
+ <output_iterations_prefix>it_</output_iterations_prefix>
+ <density_images_prefix>den_</density_images_prefix>
+ <logs_pathfile>{output_folder}/logs.txt</logs_pathfile>
+ <resume_pathfile>{output_folder}/resume.xml</resume_pathfile>
+ <fps>24</fps>
+</Project_images>
+""")
+    return project_pathfile, output_folder
+
+
+def load_image(folder, frame):
+    with Image.open(os.path.join(folder, f"img_{(frame + 1):05d}.png")) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def test_exponential_map_against_direct_renders(tmp_path):
+
+    # The resampled images are only previews : nothing else is written, their error stays within what
+    # the README documents, and the deepest image, calculated normally, is exact
+    direct_project, direct_folder = make_project(str(tmp_path), "direct")
+    mapped_project, mapped_folder = make_project(str(tmp_path), "mapped")
+    subprocess.run([sys.executable, script_pathfile, direct_project, "--cores", "1"],
+                   stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, check=True)
+    result = subprocess.run([sys.executable, script_pathfile, mapped_project, "--cores", "1", "--exponential-map"],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, text=True, check=True)
+    assert result.stdout.count("exponential map: resampled") == nb_frames
+    assert os.listdir(mapped_folder) == ["preview_exponential"]
+
+    # Colors follow the iterations, black is inside the set
+    different, flipped = [], []
+    for frame in range(nb_frames):
+        direct = load_image(direct_folder, frame)
+        mapped = load_image(os.path.join(mapped_folder, "preview_exponential"), frame)
+        different.append(np.mean(np.any(direct != mapped, axis=2)))
+        flipped.append(np.mean(np.all(direct == 0, axis=2) != np.all(mapped == 0, axis=2)))
+
+    assert different[-1] == 0
+    assert np.mean(different) < 0.15 and max(different) < 0.25
+    assert np.mean(flipped) < 0.03 and max(flipped) < 0.06
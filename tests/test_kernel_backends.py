@@ -0,0 +1,56 @@
+# Fractal Toolbox is a series of python scripts for generating images
+# and videos based on Julia and Mandelbrot sets.
+# Copyright (C) 2024  Vivien ELIE
+#
+# This file is part of Fractal Toolbox.
+#
+# Fractal Toolbox is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+#
+# Fractal Toolbox is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with Fractal Toolbox.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import sys
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import make_images
+
+x, y = np.meshgrid(np.linspace(-2.2, 0.8, 96), np.linspace(1.2, -1.2, 64))
+grids = {
+    "mandelbrot": (np.zeros(x.shape), np.zeros(y.shape), x, y),
+    "julia": (x / 2, y / 2, np.float64(-0.8), np.float64(0.156)),
+}
+
+
+@pytest.mark.parametrize("grid", sorted(grids))
+@pytest.mark.parametrize("name", ["python", "numpy", "numba"])
+def test_kernel_backend_against_numpy(name, grid):
+
+    # Each backend gives the iterations and states of the numpy kernel, calculated at once
+    # or continued from the state of a lower max_iterations
+    if name not in make_images.get_kernel_backends():
+        pytest.skip(f"{name} is not installed")
+    compute_iterations = make_images.get_kernel_backends()[name]
+    zx, zy, cx, cy = grids[grid]
+
+    expected = make_images.compute_iterations_numpy(zx, zy, cx, cy, 300, keep_state=True)
+    for result, reference in zip(compute_iterations(zx, zy, cx, cy, 300, keep_state=True), expected):
+        np.testing.assert_array_equal(result, reference)
+    np.testing.assert_array_equal(compute_iterations(zx, zy, cx, cy, 300), expected[0])
+
+    iterations, state_x, state_y = compute_iterations(zx, zy, cx, cy, 100, keep_state=True)
+    running = ~np.isnan(state_x)
+    continued = compute_iterations(state_x[running], state_y[running], np.broadcast_to(cx, x.shape)[running],
+                                   np.broadcast_to(cy, x.shape)[running], 300, start=101, keep_state=True)
+    iterations[running], state_x[running], state_y[running] = continued
+    for result, reference in zip((iterations, state_x, state_y), expected):
+        np.testing.assert_array_equal(result, reference)
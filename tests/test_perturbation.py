@@ -0,0 +1,137 @@
+# Fractal Toolbox is a series of python scripts for generating images
+# and videos based on Julia and Mandelbrot sets.
+# Copyright (C) 2024  Vivien ELIE
+#
+# This file is part of Fractal Toolbox.
+#
+# Fractal Toolbox is free software: you can redistribute it and/or modify it under the terms
+# of the GNU General Public License as published by the Free Software Foundation,
+# either version 3 of the License, or (at your option) any later version.
+#
+# Fractal Toolbox is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+# without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License along with Fractal Toolbox.
+# If not, see <https://www.gnu.org/licenses/>.
+
+
+import os
+import sys
+from decimal import Decimal, getcontext
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+import make_images
+
+
+def render(inputs, xmin, xmax, ymin, ymax, precision):
+
+    # Iterations of every pixel of the frame with perturbation, and point by point in decimal
+    frame_data = make_images.prepare_frame(0, inputs, xmin, xmax, ymin, ymax, precision,
+                                           make_images.ClassEngine.PERTURBATION, inputs[0].max_iterations)
+    delta_x, delta_y = np.meshgrid(frame_data.x_axis, frame_data.y_axis)
+    perturbation = make_images.compute_iterations_perturbation(delta_x, delta_y, frame_data)
+
+    x_axis, y_axis = make_images.compute_axes(xmin, xmax, ymin, ymax, make_images.parameters.size_x,
+                                              make_images.parameters.size_y, make_images.ClassPrecisionTier.ARBITRARY)
+    reference = np.array([[make_images.compute_point_decimal(x, y, frame_data) for x in x_axis] for y in y_axis],
+                         dtype=np.uint32)
+    return frame_data, perturbation, reference
+
+
+def test_series_skip_julia_reference_at_origin():
+
+    # The reference of a julia view centered on the origin starts at z0 = 0 : the first and third order terms
+    # of the series stay 0, the skip must not trust them
+    make_images.parameters.size_x, make_images.parameters.size_y = 96, 64
+    inputs = [make_images.ClassInput()]
+    inputs[0].type_fractal = make_images.ClassTypeFractal.JULIA
+    inputs[0].max_iterations = 200
+    inputs[0].julia_a = Decimal("-0.17439119090661093")
+    inputs[0].julia_b = Decimal("-0.13811519205206668")
+    getcontext().prec = 20
+    view = (Decimal("-1.5"), Decimal("1.5"), Decimal("-1.5"), Decimal("1.5"))
+
+    frame_data, perturbation, reference = render(inputs, *view, 20)
+    radius = float(np.sqrt(np.max(frame_data.x_axis ** 2) + np.max(frame_data.y_axis ** 2)))
+    assert make_images.select_series_skip(frame_data.reference, radius, frame_data) == 0
+
+    np.testing.assert_array_equal(perturbation, reference)
+
+
+def test_series_skip_deep_mandelbrot():
+
+    # Deep mandelbrot views still skip iterations, with the same iterations as the decimal calculation
+    make_images.parameters.size_x, make_images.parameters.size_y = 24, 16
+    inputs = [make_images.ClassInput()]
+    inputs[0].type_fractal = make_images.ClassTypeFractal.MANDELBROT
+    inputs[0].max_iterations = 1000
+    getcontext().prec = 30
+    center_x, center_y, width = Decimal("-0.743643887037151"), Decimal("0.13182590420533"), Decimal("1e-11")
+    view = (center_x - width, center_x + width, center_y - width, center_y + width)
+
+    frame_data, perturbation, reference = render(inputs, *view, 30)
+    radius = float(np.sqrt(np.max(frame_data.x_axis ** 2) + np.max(frame_data.y_axis ** 2)))
+    assert make_images.select_series_skip(frame_data.reference, radius, frame_data) > 0
+
+    np.testing.assert_array_equal(perturbation, reference)
+
+
+def test_series_skip_secondary_references(monkeypatch):
+
+    # Glitched points moved to a secondary reference also skip their first iterations, with the same iterations
+    # as the decimal calculation
+    starts = []
+    apply_series_skip = make_images.apply_series_skip
+
+    def record_series_skip(reference, dx, dy, frame_data):
+        start, dz_start = apply_series_skip(reference, dx, dy, frame_data)
+        starts.append(int(start.max(initial=0)))
+        return start, dz_start
+
+    monkeypatch.setattr(make_images, "apply_series_skip", record_series_skip)
+    make_images.parameters.size_x, make_images.parameters.size_y = 48, 32
+    inputs = [make_images.ClassInput()]
+    inputs[0].type_fractal = make_images.ClassTypeFractal.MANDELBROT
+    inputs[0].max_iterations = 3000
+    getcontext().prec = 30
+    center_x, center_y, width = Decimal("-1.768778833"), Decimal("-0.001738996"), Decimal("1e-8")
+    view = (center_x - width, center_x + width, center_y - width, center_y + width)
+
+    _, perturbation, reference = render(inputs, *view, 30)
+    assert len(starts) > 1
+    assert max(starts[1:]) > 0
+
+    np.testing.assert_array_equal(perturbation, reference)
+
+
+def test_interior_points(monkeypatch):
+
+    # Points well inside the main cardioid are not iterated, and periodic orbits around a minibrot are stopped
+    # early. Both keep 0 iteration, the same iterations as the decimal calculation.
+    iterated = []
+    iterate_perturbation = make_images.iterate_perturbation
+
+    def record_iterate_perturbation(dzx, dzy, dcx, dcy, reference, max_iterations, iterations, indexes, start=0):
+        iterated.append(indexes.size)
+        return iterate_perturbation(dzx, dzy, dcx, dcy, reference, max_iterations, iterations, indexes, start)
+
+    monkeypatch.setattr(make_images, "iterate_perturbation", record_iterate_perturbation)
+    make_images.parameters.size_x, make_images.parameters.size_y = 24, 16
+    inputs = [make_images.ClassInput()]
+    inputs[0].type_fractal = make_images.ClassTypeFractal.MANDELBROT
+    inputs[0].max_iterations = 2000
+    getcontext().prec = 30
+
+    center_x, center_y, width = Decimal("-0.1"), Decimal("0.1"), Decimal("1e-3")
+    _, perturbation, reference = render(inputs, center_x - width, center_x + width, center_y - width,
+                                        center_y + width, 30)
+    assert len(iterated) == 0
+    np.testing.assert_array_equal(perturbation, reference)
+
+    center_x, center_y, width = Decimal("-1.7548776662466927600495"), Decimal("0"), Decimal("2e-3")
+    _, perturbation, reference = render(inputs, center_x - width, center_x + width, center_y - width,
+                                        center_y + width, 30)
+    assert np.count_nonzero(perturbation == 0) > 0
+    np.testing.assert_array_equal(perturbation, reference)